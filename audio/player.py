@@ -1,17 +1,43 @@
+import threading
+from collections import OrderedDict
+
 import numpy as np
-import sounddevice as sd
-import time
-from music21 import note
+from core_ai.note_mapping import note_name_to_midi
+
+# sounddevice is imported on first playback, see _sounddevice()
+sd = None
+
+
+def _sounddevice():
+    global sd
+    if sd is None:
+        import sounddevice
+        sd = sounddevice
+    return sd
 
 
 class GuitarSoundPlayer:
-    def __init__(self, fs=44100, volume=0.25):
+    def __init__(self, fs=44100, volume=0.25, cache_size=256):
         self.fs = fs
         self.volume = volume
 
+        # LRU cache of rendered notes: (midi, duration, fs) -> float32 wave
+        self.cache_size = cache_size
+        self._wave_cache = OrderedDict()
+
+        # Playback state, shared with the audio callback thread
+        self._lock = threading.Lock()
+        self._stream = None
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._position = 0
+        self._finished = threading.Event()
+        self._finished.set()
+        # Guards _stream: stop() may run on another thread than play_buffer()
+        # (not _lock, which the callback takes while abort() waits for it)
+        self._stream_lock = threading.RLock()
+
     def note_to_freq(self, note_name: str) -> float:
-        n = note.Note(note_name)
-        midi = n.pitch.midi
+        midi = note_name_to_midi(note_name)
         return 440.0 * (2 ** ((midi - 69) / 12))
 
 
@@ -48,15 +74,130 @@ class GuitarSoundPlayer:
 
         return wave
 
-    def play_note(self, note_name, duration=0.5):
-        freq = self.note_to_freq(note_name)
-        wave = self.generate_guitar_wave(freq, duration)
-        sd.play(self.volume * wave, self.fs)
-        sd.wait()
+    def note_wave(self, midi, duration):
+        """
+        The rendered wave of one MIDI note as float32, from the LRU cache.
+        The returned array is shared and read-only.
+        """
+        key = (midi, duration, self.fs)
+        wave = self._wave_cache.get(key)
+        if wave is not None:
+            self._wave_cache.move_to_end(key)
+            return wave
+
+        freq = 440.0 * (2 ** ((midi - 69) / 12))
+        wave = self.generate_guitar_wave(freq, duration).astype(np.float32)
+        wave.flags.writeable = False
+        self._wave_cache[key] = wave
+        if len(self._wave_cache) > self.cache_size:
+            self._wave_cache.popitem(last=False)
+        return wave
 
-    def play_notes(self, notes, duration=0.5):
-        for n in notes:
-            self.play_note(n, duration)
-            time.sleep(0.03)
+    def render(self, notes, duration=0.5, step=None):
+        """
+        Renders a riff into one float32 buffer. Each entry is a note name or
+        a list of note names (a chord, averaged). Notes start every step
+        seconds (default: duration, i.e. back to back); with a shorter step
+        the tails overlap and are summed.
+        """
+        events = [[n] if isinstance(n, str) else list(n) for n in notes]
+        if not events:
+            return np.zeros(0, dtype=np.float32)
+
+        length = int(self.fs * duration)
+        hop = int(self.fs * (duration if step is None else step))
+        if hop <= 0:
+            raise ValueError("step must be positive")
+
+        # One row per distinct pitch; each event is a list of (row, weight)
+        rows = {}
+        voices = []
+        for names in events:
+            midis = [note_name_to_midi(n) for n in names]
+            voices.append([(rows.setdefault(m, len(rows)), 1.0 / len(midis)) for m in midis])
+        table = np.stack([self.note_wave(m, duration) for m in rows])
+
+        # Events period notes apart never overlap, so each phase is added
+        # as a (count, period * hop) reshape of the buffer
+        period = -(-length // hop)
+        stride = period * hop
+        total = hop * (len(events) - 1) + length
+        buffer = np.zeros(hop * len(events) + stride, dtype=np.float32)
+
+        max_voices = max(len(v) for v in voices)
+        index = np.zeros((len(events), max_voices), dtype=np.int64)
+        weight = np.zeros((len(events), max_voices), dtype=np.float32)
+        for i, voice in enumerate(voices):
+            for v, (row, w) in enumerate(voice):
+                index[i, v] = row
+                weight[i, v] = w
+
+        block = 256
+        for phase in range(period):
+            for start in range(phase, len(events), block * period):
+                chosen = slice(start, min(len(events), start + block * period), period)
+                idx, w = index[chosen], weight[chosen]
+                count = len(idx)
+                frames = buffer[start * hop:start * hop + count * stride].reshape(count, stride)
+                for v in range(max_voices):
+                    frames[:, :length] += table[idx[:, v]] * w[:, v, None]
+
+        return buffer[:total]
+
+    def play_buffer(self, buffer, start=0.0):
+        """Starts non-blocking playback of a rendered buffer, replacing any current one."""
+        with self._stream_lock:
+            self.stop()
+            with self._lock:
+                self._buffer = np.ascontiguousarray(buffer, dtype=np.float32) * np.float32(self.volume)
+                self._position = min(len(self._buffer), int(start * self.fs))
+            self._finished.clear()
+            sounddevice = _sounddevice()
+            self._stream = sounddevice.OutputStream(samplerate=self.fs, channels=1,
+                                                    dtype="float32", callback=self._callback,
+                                                    finished_callback=self._finished.set)
+            self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self._lock:
+            chunk = self._buffer[self._position:self._position + frames]
+            self._position += len(chunk)
+        outdata[:len(chunk), 0] = chunk
+        outdata[len(chunk):] = 0
+        if len(chunk) < frames:
+            raise sd.CallbackStop
+
+    def stop(self):
+        """Stops playback (no-op when idle)."""
+        with self._stream_lock:
+            stream, self._stream = self._stream, None
+            if stream is not None:
+                stream.abort()
+                stream.close()
+            self._finished.set()
+
+    def seek(self, seconds):
+        """Moves the playback position of the current buffer."""
+        with self._lock:
+            self._position = max(0, min(len(self._buffer), int(seconds * self.fs)))
+
+    @property
+    def position(self):
+        """Playback position in seconds."""
+        return self._position / self.fs
+
+    def is_playing(self):
+        return not self._finished.is_set()
+
+    def wait(self):
+        """Blocks until playback finishes."""
+        self._finished.wait()
 
+    def play_note(self, note_name, duration=0.5):
+        """Plays a note name, or a list of note names as a chord (blocking)."""
+        self.play_buffer(self.render([note_name], duration))
+        self.wait()
 
+    def play_notes(self, notes, duration=0.5):
+        """Renders the riff into one buffer and starts playing it; returns immediately."""
+        self.play_buffer(self.render(notes, duration))
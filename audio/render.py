@@ -0,0 +1,221 @@
+"""
+Offline rendering of solved fingerings to WAV, without an audio device.
+
+    python -m audio.render riffs.txt -o renders/ -w 4
+
+Each riff is solved, then rendered from its (string, fret) path with a
+Karplus-Strong plucked-string model, so the same pitch sounds different
+on different strings.
+"""
+import argparse
+import itertools
+import os
+import sys
+import wave
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core_ai.chords import event_positions
+from core_ai.instruments import get_instrument
+
+CHUNK_FRAMES = 65536
+
+# Per-process synth, built once by _init_worker
+_synth = None
+
+
+class PluckedStringSynth:
+    """
+    Karplus-Strong synthesis per (string, fret). Lower strings ring longer
+    and are plucked further from the bridge (darker); fretted notes decay
+    a little faster than open strings. Waves are cached (LRU).
+    """
+
+    def __init__(self, tuning=None, fs=44100, cache_size=512):
+        # tuning: {string: open MIDI} or a registered instrument name
+        if tuning is None or isinstance(tuning, str):
+            tuning = get_instrument(tuning or "standard").tuning
+        self.tuning = dict(tuning)
+        self.fs = fs
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def pluck(self, string, fret, duration):
+        """The float32 wave of one plucked note, shared and read-only."""
+        key = (string, fret, duration, self.fs)
+        wave_ = self._cache.get(key)
+        if wave_ is not None:
+            self._cache.move_to_end(key)
+            return wave_
+
+        wave_ = self._karplus_strong(string, fret, int(self.fs * duration))
+        wave_.flags.writeable = False
+        self._cache[key] = wave_
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return wave_
+
+    def _karplus_strong(self, string, fret, frames):
+        freq = 440.0 * (2 ** ((self.tuning[string] + fret - 69) / 12))
+        period = self.fs / freq
+        delay = max(2, int(period))
+
+        # The averaging loop sounds at fs / (delay + 0.5); resample by this
+        # ratio afterwards to land on the exact pitch
+        ratio = (delay + 0.5) / period
+        needed = int(frames * ratio) + 2
+
+        t60 = max(0.4, 1.2 + 0.3 * string - 0.04 * fret)
+        rho = 10 ** (-3 / (t60 * freq))
+
+        rng = np.random.default_rng(string * 100 + fret)
+        burst = rng.uniform(-1.0, 1.0, delay)
+        pick = max(1, int(delay * (0.08 + 0.03 * string)))
+        burst = burst - np.roll(burst, pick)
+        # Soften the noise burst with a circular moving average, wider
+        # (darker) on the lower, wound strings
+        width = max(1, int(delay * (0.05 + 0.02 * string)))
+        summed = np.cumsum(np.concatenate([burst[-width:], burst]))
+        burst = (summed[width:] - summed[:-width]) / width
+        burst -= burst.mean()
+
+        # y[n] = rho/2 * (y[n-N] + y[n-N-1]), one delay-line period per block
+        blocks = np.empty((-(-needed // delay), delay))
+        blocks[0] = burst
+        previous_last = 0.0
+        for k in range(1, len(blocks)):
+            prev = blocks[k - 1]
+            blocks[k, 0] = prev[0] + previous_last
+            blocks[k, 1:] = prev[1:] + prev[:-1]
+            blocks[k] *= 0.5 * rho
+            previous_last = prev[-1]
+        samples = blocks.ravel()[:needed]
+
+        out = np.interp(np.arange(frames) * ratio, np.arange(needed), samples)
+        out /= max(1e-9, np.max(np.abs(out[:delay * 2])))
+
+        fade = min(frames, int(0.005 * self.fs))
+        out[frames - fade:] *= np.linspace(1.0, 0.0, fade)
+        return out.astype(np.float32)
+
+    def render_chunks(self, path, duration=0.5, step=None, chunk_frames=CHUNK_FRAMES):
+        """
+        Yields the rendered path as float32 chunks of at most chunk_frames
+        samples. Entries start every step seconds (default: duration);
+        chords are averaged. Memory does not grow with the path length.
+        """
+        events = [event_positions(entry) for entry in path]
+        if not events:
+            return
+
+        length = int(self.fs * duration)
+        hop = int(self.fs * (duration if step is None else step))
+        if hop <= 0:
+            raise ValueError("step must be positive")
+        total = hop * (len(events) - 1) + length
+
+        for start in range(0, total, chunk_frames):
+            end = min(total, start + chunk_frames)
+            chunk = np.zeros(end - start, dtype=np.float32)
+
+            first = max(0, -(-(start - length + 1) // hop))
+            last = min(len(events) - 1, (end - 1) // hop)
+            for i in range(first, last + 1):
+                onset = i * hop
+                lo, hi = max(start, onset), min(end, onset + length)
+                gain = np.float32(1.0 / len(events[i]))
+                for string, fret in events[i]:
+                    note = self.pluck(string, fret, duration)
+                    chunk[lo - start:hi - start] += gain * note[lo - onset:hi - onset]
+            yield chunk
+
+    def write_wav(self, filename, path, duration=0.5, step=None, volume=0.8,
+                  chunk_frames=CHUNK_FRAMES):
+        """Renders the path to a 16-bit mono WAV file chunk by chunk. Returns the frame count."""
+        frames = 0
+        with wave.open(filename, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.fs)
+            for chunk in self.render_chunks(path, duration, step, chunk_frames):
+                pcm = np.clip(chunk * volume, -1.0, 1.0) * 32767
+                out.writeframes(pcm.astype("<i2").tobytes())
+                frames += len(chunk)
+        return frames
+
+
+def _init_worker(tuning, fs):
+    global _synth
+    _synth = PluckedStringSynth(tuning, fs)
+
+
+def _render_job(job):
+    filename, path, options = job
+    return filename, _synth.write_wav(filename, path, **options)
+
+
+def render_batch(jobs, workers=None, tuning=None, fs=44100, **options):
+    """
+    Renders (filename, path) jobs on a process pool and yields
+    (filename, frames) in input order. Jobs are consumed lazily with a few
+    per worker in flight. options go to write_wav; workers=0 renders
+    in the calling process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    jobs = ((filename, path, options) for filename, path in jobs)
+
+    if workers == 0:
+        _init_worker(tuning, fs)
+        for job in jobs:
+            yield _render_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tuning, fs)) as executor:
+        pending = deque(executor.submit(_render_job, job)
+                        for job in itertools.islice(jobs, workers * 2))
+        while pending:
+            yield pending.popleft().result()
+            for job in itertools.islice(jobs, 1):
+                pending.append(executor.submit(_render_job, job))
+
+
+def main(argv=None):
+    from core_ai.batch import run_fingering_batch
+    from core_ai.cli import read_riffs
+
+    parser = argparse.ArgumentParser(prog="python -m audio.render", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="riff text files, MIDI/MusicXML, or - for stdin")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-i", "--instrument", default="standard",
+                        help="registered tuning / instrument name")
+    parser.add_argument("--duration", type=float, default=0.5, help="note length in seconds")
+    parser.add_argument("--step", type=float, default=None,
+                        help="seconds between note onsets (default: duration)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = 0 if args.workers is None else args.workers
+
+    def jobs():
+        riffs = (riff for _, riff in read_riffs(args.inputs))
+        for record in run_fingering_batch(riffs, workers=workers, instrument=args.instrument):
+            if record["error"]:
+                print(f"riff {record['index']}: {record['error']['message']}", file=sys.stderr)
+                continue
+            yield os.path.join(args.output_dir, f"riff_{record['index']:05d}.wav"), record["path"]
+
+    for filename, frames in render_batch(jobs(), args.workers, tuning=args.instrument,
+                                         duration=args.duration, step=args.step):
+        print(f"{filename}\t{frames / 44100:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import random
+
+from core_ai.instruments import INSTRUMENTS
+from core_ai.note_mapping import NoteMapper
+from core_ai.riff_generator import load_note_pool
+
+# Tunings / instruments from the registry, by name
+TUNINGS = INSTRUMENTS
+
+
+def make_mapper(tuning="standard", num_frets=None):
+    return NoteMapper(num_frets, instrument=tuning)
+
+
+def playable_range(mapper):
+    return min(mapper.position_index), max(mapper.position_index)
+
+
+def excel_riff(length, seed, mapper):
+    """Notes drawn from the workbook pool, keeping those playable in this tuning."""
+    return full_range_riff(length, seed, mapper, list(load_note_pool(mapper=mapper)))
+
+
+def full_range_riff(length, seed, mapper, pool=None):
+    """Notes drawn uniformly from the pool (default: whole playable range)."""
+    rng = random.Random(seed)
+    if pool is None:
+        low, high = playable_range(mapper)
+        pool = [mapper.midi_to_note_name(m) for m in range(low, high + 1)]
+    return [rng.choice(pool) for _ in range(length)]
+
+
+def narrow_range_riff(length, seed, mapper, width=12):
+    """A random walk inside one octave around the middle of the neck."""
+    rng = random.Random(seed)
+    low, high = playable_range(mapper)
+    center = (low + high) // 2
+    lo, hi = center - width // 2, center + width // 2
+    midi = center
+    riff = []
+    for _ in range(length):
+        midi = min(hi, max(lo, midi + rng.randint(-3, 3)))
+        riff.append(mapper.midi_to_note_name(midi))
+    return riff
+
+
+DISTRIBUTIONS = {
+    "full": full_range_riff,
+    "narrow": narrow_range_riff,
+    "excel": excel_riff,
+}
@@ -0,0 +1,168 @@
+"""
+Load generator for the fingering service (core_ai.server). Keeps
+--concurrency keep-alive connections busy with POST /solve requests
+drawn from --distinct seeded random riffs (fewer distinct riffs means
+more coalescing), then reports client-side latency and throughput next
+to the server's own /metrics, as JSON.
+
+    python -m benchmarks.loadgen --serve -w 4 -n 5000 -c 64
+    python -m benchmarks.loadgen --port 8765 -n 2000
+    python -m benchmarks.loadgen --unix /tmp/fingering.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from core_ai.riff_generator import random_riffs
+from core_ai.server import latency_summary
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 client connection."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, method, target, payload=None):
+        """Returns (status, decoded JSON body)."""
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = (f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        self.writer.close()
+
+
+async def run_load(host, port, unix_path=None, requests=1000, concurrency=32, length=16,
+                   distinct=100, timeout=None, seed=0):
+    riffs = [" ".join(riff) for riff in random_riffs(distinct, length, seed)]
+    rng = random.Random(seed)
+    schedule = [rng.choice(riffs) for _ in range(requests)]
+    latencies = []
+    statuses = Counter()
+    next_request = iter(schedule)
+
+    async def client():
+        connection = await Connection.open(host, port, unix_path)
+        try:
+            for riff in next_request:
+                payload = {"riff": riff}
+                if timeout is not None:
+                    payload["timeout"] = timeout
+                started = time.perf_counter()
+                status, _ = await connection.request("POST", "/solve", payload)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    connection = await Connection.open(host, port, unix_path)
+    _, server_metrics = await connection.request("GET", "/metrics")
+    connection.close()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "distinct_riffs": distinct,
+        "riff_length": length,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "latency_ms": latency_summary(sorted(latencies)),
+        "server": server_metrics,
+    }
+
+
+def start_server(args):
+    """Starts core_ai.server on a free port and returns (process, port)."""
+    command = [sys.executable, "-m", "core_ai.server", "--port", "0", "-e", args.engine]
+    if args.workers is not None:
+        command += ["-w", str(args.workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("listening on "):
+        process.kill()
+        raise RuntimeError("Server did not start")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead")
+    parser.add_argument("--serve", action="store_true",
+                        help="start a server on a free localhost port for the run")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes of the --serve server")
+    parser.add_argument("-e", "--engine", default="astar", help="engine of the --serve server")
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--length", type=int, default=16, help="notes per riff")
+    parser.add_argument("--distinct", type=int, default=100, help="distinct riffs to draw from")
+    parser.add_argument("--timeout", type=float, default=None, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the report JSON here (default stdout)")
+    args = parser.parse_args(argv)
+
+    process = None
+    port, unix_path = args.port, args.unix
+    if args.serve:
+        process, port = start_server(args)
+        unix_path = None
+
+    try:
+        report = asyncio.run(run_load(args.host, port, unix_path, args.requests,
+                                      args.concurrency, args.length, args.distinct,
+                                      args.timeout, args.seed))
+    finally:
+        if process is not None:
+            # SIGINT lets the server shut its worker pool down
+            process.send_signal(signal.SIGINT if os.name == "posix" else signal.SIGTERM)
+            process.wait()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Reproducible performance benchmarks for the solver, cost model, note
+mapper, audio synthesis and cold start (see benchmarks.startup).
+
+    python -m benchmarks.run --quick -o baseline.json
+    python -m benchmarks.run --quick --compare baseline.json
+
+Results are written as JSON. With --compare, every case that got slower
+(or used more memory / expanded more nodes) than the baseline by more than
+--threshold is reported and the exit code is 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.generators import DISTRIBUTIONS, TUNINGS, make_mapper
+from benchmarks.startup import bench_startup
+from core_ai.api import ENGINES, calculate_final_metrics
+from core_ai.note_mapping import note_name_to_midi
+from core_ai.search_astar import GuitarPathProblem
+
+SIZES = (10, 100, 1000, 10000, 100000)
+QUICK_SIZES = (10, 100, 1000)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def peak_memory(fn, *args, **kwargs):
+    """Peak bytes allocated by Python while fn runs."""
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def solve_phases(riff, mapper, engine):
+    """
+    One solve split into parse / search / metrics phases, like
+    run_fingering_algorithm does it.
+    """
+    note_name_to_midi.cache_clear()
+    phases = {}
+    stats = {}
+
+    def parse():
+        for note_name in riff:
+            mapper.find_positions_on_fretboard(mapper.note_to_midi(note_name))
+
+    _, phases["parse"] = timed(parse)
+
+    problem = GuitarPathProblem(riff, mapper)
+    path_nodes, phases["search"] = timed(ENGINES[engine], problem, stats=stats)
+
+    path = [node.state[:2] for node in path_nodes[1:]] if path_nodes else []
+    _, phases["metrics"] = timed(calculate_final_metrics, path, problem.cost_calculator)
+    return phases, stats
+
+
+def bench_solve(engine, distribution, tuning, size, seed, repeat, memory):
+    mapper = make_mapper(tuning)
+    riff = DISTRIBUTIONS[distribution](size, seed, mapper)
+
+    runs = [solve_phases(riff, mapper, engine) for _ in range(repeat)]
+    phases, stats = min(runs, key=lambda run: sum(run[0].values()))
+
+    result = {
+        "name": f"solve/{engine}/{distribution}/{tuning}/{size}",
+        "params": {"engine": engine, "distribution": distribution, "tuning": tuning,
+                   "size": size, "seed": seed},
+        "wall_time": sum(phases.values()),
+        "phases": phases,
+    }
+    if "nodes_expanded" in stats:
+        result["nodes_expanded"] = stats["nodes_expanded"]
+        result["max_frontier"] = stats["max_frontier"]
+    if memory:
+        result["peak_memory_bytes"] = peak_memory(solve_phases, riff, mapper, engine)
+    return result
+
+
+def bench_note_parsing(size, seed, repeat):
+    mapper = make_mapper()
+    riff = DISTRIBUTIONS["full"](size, seed, mapper)
+
+    def parse():
+        for note_name in riff:
+            mapper.note_to_midi(note_name)
+
+    def cold():
+        note_name_to_midi.cache_clear()
+        parse()
+
+    return {
+        "name": f"note_to_midi/{size}",
+        "params": {"size": size, "seed": seed},
+        "wall_time": min(timed(cold)[1] for _ in range(repeat)),
+        "phases": {"warm": min(timed(parse)[1] for _ in range(repeat))},
+    }
+
+
+def bench_metrics(size, seed, repeat):
+    mapper = make_mapper()
+    rng = np.random.default_rng(seed)
+    path = [(int(s), int(f)) for s, f in zip(rng.integers(1, 7, size), rng.integers(0, 23, size))]
+    problem = GuitarPathProblem([], mapper)
+
+    return {
+        "name": f"calculate_final_metrics/{size}",
+        "params": {"size": size, "seed": seed},
+        "wall_time": min(timed(calculate_final_metrics, path, problem.cost_calculator)[1]
+                         for _ in range(repeat)),
+    }
+
+
+def bench_audio(duration, repeat):
+    try:
+        from audio.player import GuitarSoundPlayer
+    except (ImportError, OSError) as e:
+        return {"name": f"generate_guitar_wave/{duration}", "skipped": str(e)}
+
+    player = GuitarSoundPlayer()
+    freqs = [82.41, 110.0, 146.83, 196.0, 246.94, 329.63]
+
+    def render():
+        for freq in freqs:
+            player.generate_guitar_wave(freq, duration)
+
+    return {
+        "name": f"generate_guitar_wave/{duration}",
+        "params": {"duration": duration, "notes": len(freqs)},
+        "wall_time": min(timed(render)[1] for _ in range(repeat)),
+    }
+
+
+def run_suite(sizes, engines, distributions, tunings, seed, repeat, memory):
+    results = []
+    for size in sizes:
+        for engine in engines:
+            for distribution in distributions:
+                for tuning in tunings:
+                    results.append(bench_solve(engine, distribution, tuning, size,
+                                               seed, repeat, memory))
+        results.append(bench_note_parsing(size, seed, repeat))
+        results.append(bench_metrics(size, seed, repeat))
+    for duration in (0.5, 2.0):
+        results.append(bench_audio(duration, repeat))
+    results.extend(bench_startup(repeat))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of regressions: cases whose wall time, peak memory or
+    node count grew by more than threshold relative to the baseline.
+    """
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry["name"])
+        if not old or "skipped" in entry or "skipped" in old:
+            continue
+        for key in ("wall_time", "peak_memory_bytes", "nodes_expanded"):
+            if key in entry and old.get(key):
+                ratio = entry[key] / old[key]
+                if ratio > 1 + threshold:
+                    regressions.append({"name": entry["name"], "metric": key,
+                                        "baseline": old[key], "current": entry[key],
+                                        "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--quick", action="store_true", help=f"sizes {QUICK_SIZES} only")
+    parser.add_argument("--engines", nargs="+", default=["astar", "viterbi"],
+                        choices=sorted(ENGINES))
+    parser.add_argument("--distributions", nargs="+", default=sorted(DISTRIBUTIONS),
+                        choices=sorted(DISTRIBUTIONS))
+    parser.add_argument("--tunings", nargs="+", default=["standard", "drop_d"],
+                        choices=sorted(TUNINGS))
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the (slow) tracemalloc pass")
+    parser.add_argument("-o", "--output", help="write results JSON here (default stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown before flagging (default 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    results = run_suite(sizes, args.engines, args.distributions, args.tunings,
+                        args.seed, args.repeat, not args.no_memory)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['name']} {r['metric']}: {r['baseline']} -> {r['current']} "
+                  f"(x{r['ratio']})", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
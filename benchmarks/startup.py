@@ -0,0 +1,74 @@
+"""
+Cold-start times of the package entry points, each measured in a fresh
+interpreter so nothing is cached in sys.modules.
+
+    python -m benchmarks.startup
+"""
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must not be imported just to start up
+HEAVY_MODULES = ("music21", "pandas", "sounddevice")
+
+CASES = {
+    "import core_ai": "import core_ai",
+    "import core_ai.api": "import core_ai.api",
+    "import core_ai.cli": "import core_ai.cli",
+    "import gui.app": "import gui.app",
+    # Until the main window has been drawn once; needs a display
+    "gui window": ("import tkinter as tk\n"
+                   "from gui.app import GuitarAIApp\n"
+                   "root = tk.Tk()\n"
+                   "GuitarAIApp(root)\n"
+                   "root.update()\n"
+                   "root.destroy()"),
+}
+
+CHILD = """\
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(code, repeat=3):
+    """
+    Runs code in fresh interpreters and returns (best seconds, heavy
+    modules it imported). Raises RuntimeError if the code fails.
+    """
+    script = CHILD.format(code=code, heavy=HEAVY_MODULES)
+    best, heavy = None, []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", script], cwd=ROOT,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines() or ["exit code %d" % proc.returncode]
+            raise RuntimeError(lines[-1])
+        seconds, _, modules = proc.stdout.strip().splitlines()[-1].partition(" ")
+        if best is None or float(seconds) < best:
+            best = float(seconds)
+        heavy = [m for m in modules.split(",") if m]
+    return best, heavy
+
+
+def bench_startup(repeat=3):
+    """One benchmark entry per case, in the format of benchmarks.run."""
+    results = []
+    for name, code in CASES.items():
+        entry = {"name": f"startup/{name}"}
+        try:
+            entry["wall_time"], entry["heavy_modules"] = measure(code, repeat)
+        except RuntimeError as e:
+            entry["skipped"] = str(e)
+        results.append(entry)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(bench_startup(), indent=2))
@@ -1,87 +1,195 @@
 from core_ai.search_astar import astar_search, GuitarPathProblem
+from core_ai.search_viterbi import viterbi_search, checkpoint_search
+from core_ai.segments import parallel_segment_search
+from core_ai.kbest import KBestFingerings
+from core_ai.pareto import pareto_front, pareto_mask
+from core_ai.chords import has_chords, solve_events, shape_anchor, shape_span
 from core_ai.cost import ErgonomicCost
-import pandas as pd
+from core_ai.perf import PerfRecorder, NULL_RECORDER
+from core_ai.result_cache import cache_key
+from core_ai.riff_generator import load_note_pool
+import itertools
+import numpy as np
 import random
-
-def run_fingering_algorithm(riff):
+import sys
+
+# Interchangeable search engines: all return an optimal node path of the
+# same total cost. astar, viterbi and checkpoint return the same path;
+# parallel may resolve ties differently where it forces a split
+ENGINES = {
+    "astar": astar_search,
+    "viterbi": viterbi_search,
+    "checkpoint": checkpoint_search,
+    "parallel": parallel_segment_search,
+}
+
+
+def run_fingering_algorithm(riff, engine="astar", mapper=None, evaluator=None,
+                            heuristic="uniform", k=None, perf=False, progress=None,
+                            cache=None, pareto=False):
     """
-    Runs the A* fingering optimization and returns the final path + analysis.
+    Runs the fingering optimization and returns the final path + analysis.
+    With k set, returns a list of up to k (path, analysis) tuples instead:
+    the k cheapest distinct fingerings in increasing total cost.
+    engine: "astar" (default), "viterbi" (layered DP, O(n·k²)) or
+    "checkpoint" (Viterbi with √n memory, about twice the time) or
+    "parallel" (segments split at forced notes, solved on all cores).
+    mapper / evaluator: optional pre-built NoteMapper / ErgonomicCost to reuse.
+    heuristic: A* heuristic, see GuitarPathProblem.h. Non-uniform ones
+    expand fewer nodes but may pick a different path among equal-cost ties.
+    Riffs containing chords (tuples of notes) are solved over chord shapes
+    with solve_events, whatever the engine.
+    perf: adds a "perf" dict to the analysis with phase timings, search
+    counters and note-parse cache statistics (ignored with k).
+    progress: a core_ai.progress.Progress fed by the search; cancelling
+    it raises SolveCancelled out of this call.
+    cache: a core_ai.result_cache.ResultCache; results are looked up and
+    stored under the normalized riff, tuning and cost weights (not with k).
+    pareto: returns the Pareto front over stretch, string shift and
+    penalty count instead, as (path, analysis) tuples in increasing total
+    cost (single notes only; engine, k, perf and cache do not apply).
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+
     if not riff:
-        return [], {"total": 0}
+        return [] if k is not None or pareto else ([], {"total": 0})
 
-    problem = GuitarPathProblem(riff)
-    evaluator = problem.cost_calculator  # SAME cost model as A*
+    if pareto:
+        return _pareto_alternatives(riff, mapper, evaluator, progress)
+
+    recorder = PerfRecorder() if perf and k is None else NULL_RECORDER
+    stats = {} if perf else None
 
-    path_nodes = astar_search(problem)
+    problem = GuitarPathProblem(riff, mapper, evaluator, heuristic)
+    evaluator = problem.cost_calculator  # SAME cost model as A*
 
-    if not path_nodes:
-        return [], {"total": 0}
+    key = None
+    if cache is not None and k is None:
+        with recorder.phase("cache"):
+            key = cache_key(riff, problem.mapper, evaluator, engine, heuristic)
+            cached = cache.get(key)
+        if cached is not None:
+            path, analysis = cached
+            if recorder is not NULL_RECORDER:
+                recorder.add_counters({"cache_hit": 1})
+                analysis["perf"] = recorder.as_dict()
+            return path, analysis
+
+    if has_chords(riff):
+        if k is not None:
+            raise ValueError("k-best enumeration does not support chords")
+        with recorder.phase("search"):
+            path, _ = solve_events(riff, problem, progress=progress)
+        return _finish(path, evaluator, recorder, cache, key)
+
+    if k is not None:
+        alternatives = itertools.islice(KBestFingerings(problem), k)
+        return [(path, calculate_final_metrics(path, evaluator)) for path, _ in alternatives]
+
+    if recorder is not NULL_RECORDER:
+        # Timed apart from the search; the mapper caches the lookups it reuses
+        with recorder.phase("parse"):
+            for note_name in riff:
+                problem.mapper.find_positions_on_fretboard(problem.mapper.note_to_midi(note_name))
+
+    with recorder.phase("search"):
+        path_nodes = ENGINES[engine](problem, stats=stats, progress=progress)
+
+    if stats:
+        recorder.add_counters(stats)
 
     final_path = [
         (node.state[0], node.state[1])
-        for node in path_nodes
+        for node in path_nodes or []
         if node.state[2] != -1
     ]
 
-    analysis = calculate_final_metrics(final_path, evaluator)
+    return _finish(final_path, evaluator, recorder, cache, key)
 
-    return final_path, analysis
 
+def _pareto_alternatives(riff, mapper, evaluator, progress):
+    if has_chords(riff):
+        raise ValueError("Pareto fronts do not support chords")
 
-def calculate_final_metrics(path, evaluator: ErgonomicCost):
+    problem = GuitarPathProblem(riff, mapper, evaluator)
+    evaluator = problem.cost_calculator
+    front = [(path, calculate_final_metrics(path, evaluator))
+             for path in pareto_front(problem, progress=progress)]
+
+    # Zero weights can make distinct fret / string counts cost the same
+    weighted = [[round(analysis[key] * 100) for key in ("stretch", "string", "penalty_count")]
+                for _, analysis in front]
+    front = [front[i] for i in pareto_mask(weighted)]
+    front.sort(key=lambda item: (item[1]["total"], item[1]["stretch"]))
+    return front
+
+
+def _finish(path, evaluator, recorder, cache=None, key=None):
     """
-    Produces metrics CONSISTENT with the A* cost function.
+    Computes the analysis (with perf data when recording) for a path and
+    stores the result in the cache when one is given.
     """
+    if not path:
+        analysis = {"total": 0}
+    else:
+        with recorder.phase("metrics"):
+            analysis = calculate_final_metrics(path, evaluator)
 
-    total_cost = 0.0
-    stretch_total = 0.0
-    string_total = 0.0
-    penalty_count = 0
-    open_string_count = 0
+    if cache is not None:
+        cache.put(key, path, analysis)
 
-    for i in range(1, len(path)):
-        p1, p2 = path[i - 1], path[i]
+    if recorder is not NULL_RECORDER:
+        analysis["perf"] = recorder.as_dict()
 
-        step_cost = evaluator.calculate_step_cost(p1, p2)
-        total_cost += step_cost
+    return path, analysis
 
-        stretch = abs(p1[1] - p2[1]) * evaluator.FRET_STRETCH_WEIGHT
-        string = abs(p1[0] - p2[0]) * evaluator.STRING_CHANGE_WEIGHT
 
-        stretch_total += stretch
-        string_total += string
+def calculate_final_metrics(path, evaluator: ErgonomicCost):
+    """
+    Produces metrics CONSISTENT with the A* cost function.
+    Every step is looked up in the evaluator's transition table at once.
+    Chord entries move by their anchor and add their shape span to stretch.
+    """
+    shape_stretch = 0.0
+    if any(isinstance(entry[0], tuple) for entry in path):
+        shape_stretch = sum(shape_span(entry) for entry in path) * evaluator.FRET_STRETCH_WEIGHT
+        path = [shape_anchor(entry) for entry in path]
+
+    if len(path) < 2:
+        return {"stretch": round(shape_stretch, 2), "string": 0.0,
+                "pos": round(shape_stretch, 2), "penalty_count": 0,
+                "total": round(shape_stretch, 2)}
 
-        if not evaluator.is_physically_possible(p1, p2):
-            penalty_count += 1
+    positions = np.asarray(path)
+    # Paths from a larger board than the evaluator's get a resized copy
+    evaluator = evaluator.sized_for(int(positions[:, 0].max()), int(positions[:, 1].max()))
+    steps = evaluator.step_components(positions[:-1], positions[1:])
 
-        if p2[1] == 0 and evaluator.is_physically_possible(p1, p2):
-            open_string_count += 1
+    stretch_total = float(steps["stretch"].sum()) + shape_stretch
+    string_total = float(steps["string_shift"].sum())
 
     return {
         "stretch": round(stretch_total, 2),
         "string": round(string_total, 2),
         "pos": round(stretch_total + string_total, 2),
-        "penalty_count": penalty_count,
-        "total": round(total_cost, 2)
+        "penalty_count": int(steps["penalty"].sum()),
+        "total": round(float(steps["cost"].sum()) + shape_stretch, 2)
     }
 
-def generate_random_riff_from_excel():
+def generate_random_riff_from_excel(length=10):
     """
-    Selects 10 random notes from column B (rows 2-48) of guitar_midi_notes.xlsx.
+    Selects random notes from column B (rows 2-48) of guitar_midi_notes.xlsx.
+    The note pool is read once and cached (see riff_generator.load_note_pool).
     """
     try:
-        # Load the Excel file focusing on the specific range
-        df = pd.read_excel("guitar_midi_notes.xlsx", usecols=[1], skiprows=1, nrows=47, header=None,engine="openpyxl")
-
-        # Convert the column data to a list and filter out empty values
-        all_notes = df.iloc[:, 0].dropna().tolist()
+        all_notes = load_note_pool()
 
-        # Pick 10 random samples from the list
-        selected_notes = random.sample(all_notes, 10)
+        # Pick random samples from the pool
+        selected_notes = random.sample(all_notes, min(length, len(all_notes)))
 
-        return " ".join(map(str, selected_notes))
-    except Exception as e:
-        print(f"Excel Reading Error: {e}")
+        return " ".join(selected_notes)
+    except (OSError, ImportError, ValueError) as e:
+        print(f"Excel Reading Error: {e}", file=sys.stderr)
         # Fallback riff in case of file issues
-        return "E2 G2 B2 D3 G3 B3 E4 D4 B3 G3"
\ No newline at end of file
+        return "E2 G2 B2 D3 G3 B3 E4 D4 B3 G3"
@@ -0,0 +1,143 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core_ai.api import run_fingering_algorithm, ENGINES
+from core_ai.chords import parse_riff, event_notes
+from core_ai.cost import ErgonomicCost
+from core_ai.instruments import INSTRUMENTS
+from core_ai.note_mapping import NoteMapper
+from core_ai.result_cache import ResultCache
+
+# Per-process shared models, built once by _init_worker
+_mapper = None
+_evaluator = None
+_engine = "astar"
+_cache = None
+
+
+def _init_worker(engine, cache_path=None, instrument="standard"):
+    global _mapper, _evaluator, _engine, _cache
+    _mapper = NoteMapper(instrument=instrument)
+    _evaluator = ErgonomicCost(_mapper.num_strings, _mapper.num_frets)
+    _evaluator.transition_table()  # Build the cost tables up front
+    _engine = engine
+    # Every worker opens the shared SQLite store itself
+    _cache = ResultCache(cache_path) if cache_path else None
+
+
+def validate_riff(riff, mapper):
+    """
+    Returns an error record for the first unusable note, or None if every
+    note can be parsed and played on the fretboard.
+    """
+    for position, event in enumerate(riff):
+        for note_name in event_notes(event):
+            midi_val = mapper.note_to_midi(note_name)
+            if midi_val is None:
+                return {"type": "unparseable_note", "note": note_name, "position": position,
+                        "message": f"Cannot parse note '{note_name}'"}
+            if not mapper.find_positions_on_fretboard(midi_val):
+                return {"type": "out_of_range", "note": note_name, "position": position,
+                        "message": f"Note '{note_name}' is not playable on the fretboard"}
+    return None
+
+
+def solve_riff(index, riff):
+    """
+    Solves one riff with the worker's shared models and always returns a
+    result record; failures are reported in its "error" field.
+    """
+    if isinstance(riff, str):
+        riff = parse_riff(riff)
+    else:
+        riff = list(riff)
+
+    record = {"index": index, "riff": riff, "path": [], "analysis": None, "error": None}
+
+    try:
+        record["error"] = validate_riff(riff, _mapper)
+        if record["error"] is None:
+            path, analysis = run_fingering_algorithm(riff, _engine, _mapper, _evaluator,
+                                                     cache=_cache)
+            record["path"] = path
+            record["analysis"] = analysis
+            if riff and not path:
+                record["error"] = {"type": "no_fingering",
+                                   "message": "No playable fingering (chord shape) found"}
+    except Exception as e:
+        record["error"] = {"type": "exception", "message": f"{type(e).__name__}: {e}"}
+
+    return record
+
+
+def _solve_chunk(chunk):
+    return [solve_riff(index, riff) for index, riff in chunk]
+
+
+def run_fingering_batch(riffs, workers=None, chunksize=64, ordered=True, engine="astar",
+                        cache_path=None, instrument="standard"):
+    """
+    Solves an iterable of riffs (event lists or riff text, see parse_riff) on a
+    process pool and yields one result record per riff:
+
+        {"index", "riff", "path", "analysis", "error"}
+
+    Records come back in input order (ordered=True) or as soon as their
+    chunk completes. Input is consumed lazily and at most a few chunks per
+    worker are in flight, so memory stays bounded on very large corpora.
+    workers=0 solves in the calling process. With cache_path, results are
+    served from and stored in a ResultCache database shared by all workers.
+    instrument: a registered instrument name (see core_ai.instruments).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    if instrument not in INSTRUMENTS:
+        raise ValueError(f"Unknown instrument: {instrument}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunks = _chunked(enumerate(riffs), chunksize)
+
+    if workers == 0:
+        _init_worker(engine, cache_path, instrument)
+        for chunk in chunks:
+            yield from _solve_chunk(chunk)
+        return
+
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(engine, cache_path, instrument)) as executor:
+        pending = deque()
+
+        for chunk in itertools.islice(chunks, max_in_flight):
+            pending.append(executor.submit(_solve_chunk, chunk))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [f for f in pending if f in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                yield from future.result()
+
+            for chunk in itertools.islice(chunks, len(done)):
+                pending.append(executor.submit(_solve_chunk, chunk))
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
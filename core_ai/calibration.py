@@ -0,0 +1,359 @@
+"""
+Fits the ErgonomicCost weights to human fingerings.
+
+    python -m core_ai.calibration tabs.jsonl --configs 1000 -w 8 -o report.json
+
+The corpus is JSONL with a "riff" (text or list of notes) and its
+reference fingering under "path" (the CLI's output format) or "reference".
+Every riff is solved under all candidate weight vectors at once: the DP
+runs over (riffs x configs x candidates) arrays, one layer at a time.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core_ai.chords import parse_riff, is_chord
+from core_ai.cost import ErgonomicCost
+from core_ai.instruments import INSTRUMENTS
+from core_ai.note_mapping import NoteMapper
+
+WEIGHTS = ErgonomicCost.WEIGHT_ATTRIBUTES
+
+# (low, high) per weight for random_weights
+DEFAULT_BOUNDS = {
+    "FRET_STRETCH_WEIGHT": (0.25, 4.0),
+    "STRING_CHANGE_WEIGHT": (0.25, 6.0),
+    "OPEN_STRING_BONUS": (-3.0, 0.0),
+    "MAX_REACHABLE_STRETCH": (2, 7),
+    "ANATOMICAL_PENALTY": (0.0, 40.0),
+}
+
+# Extra cost GuitarPathProblem.path_cost adds to penalized steps
+STEP_PENALTY = 15.0
+
+# Per-process weight matrix, set by _init_worker
+_weights = None
+
+
+def default_weights():
+    evaluator = ErgonomicCost()
+    return {name: getattr(evaluator, name) for name in WEIGHTS}
+
+
+def weight_grid(**values):
+    """
+    Cartesian product of candidate values per weight (missing weights keep
+    their ErgonomicCost default), as a (configs, len(WEIGHTS)) array.
+    """
+    unknown = set(values) - set(WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+    defaults = default_weights()
+    axes = [values.get(name, [defaults[name]]) for name in WEIGHTS]
+    return np.array(list(itertools.product(*axes)), dtype=np.float64)
+
+
+def random_weights(count, seed=None, bounds=None):
+    """count weight vectors drawn uniformly from bounds (MAX_REACHABLE_STRETCH is integral)."""
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+    rng = np.random.default_rng(seed)
+    columns = []
+    for name in WEIGHTS:
+        low, high = bounds[name]
+        if name == "MAX_REACHABLE_STRETCH":
+            columns.append(rng.integers(low, high + 1, count).astype(np.float64))
+        else:
+            columns.append(rng.uniform(low, high, count))
+    return np.stack(columns, axis=1)
+
+
+def apply_weights(evaluator, weights):
+    """Sets one weight vector (row of a weight matrix, or a dict) on an ErgonomicCost."""
+    if not isinstance(weights, dict):
+        weights = dict(zip(WEIGHTS, weights))
+    for name, value in weights.items():
+        setattr(evaluator, name, int(value) if name == "MAX_REACHABLE_STRETCH" else float(value))
+    return evaluator
+
+
+def load_corpus(path):
+    """Reads (riff, reference) pairs from a JSONL file, skipping failed rows."""
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("error"):
+                continue  # Failed rows of a batch run
+            riff = row["riff"]
+            riff = parse_riff(riff) if isinstance(riff, str) else riff
+            reference = row.get("reference", row.get("path"))
+            if reference is None:
+                raise ValueError(f"{path}:{line_number}: no reference fingering")
+            corpus.append((riff, [tuple(p) for p in reference]))
+    return corpus
+
+
+def encode_corpus(corpus, mapper):
+    """
+    Turns (riff, reference) pairs into (positions, valid, reference index)
+    arrays, candidates padded to the string count. Raises ValueError for
+    chords, unplayable notes and references that do not match the riff.
+    """
+    width = mapper.num_strings
+    encoded = []
+    for number, (riff, reference) in enumerate(corpus):
+        if len(riff) != len(reference) or not riff:
+            raise ValueError(f"Riff {number}: reference length does not match the riff")
+        positions = np.zeros((len(riff), width, 2), dtype=np.int16)
+        valid = np.zeros((len(riff), width), dtype=bool)
+        ref = np.zeros(len(riff), dtype=np.int64)
+        for i, (note_name, target) in enumerate(zip(riff, reference)):
+            if is_chord(note_name):
+                raise ValueError(f"Riff {number}: chords are not supported")
+            candidates = mapper.find_positions_on_fretboard(mapper.note_to_midi(note_name))
+            if tuple(target) not in candidates:
+                raise ValueError(f"Riff {number}: {target} does not play {note_name}")
+            positions[i, :len(candidates)] = candidates
+            valid[i, :len(candidates)] = True
+            ref[i] = candidates.index(tuple(target))
+        encoded.append((positions, valid, ref))
+    return encoded
+
+
+def _stack_chunk(riffs):
+    """
+    Pads a group of encoded riffs to one length. Padding layers repeat the
+    last real layer and only allow staying on the same candidate at no
+    cost, so they do not change any riff's optimum.
+    """
+    n = max(len(ref) for _, _, ref in riffs)
+    width = riffs[0][0].shape[1]
+    positions = np.zeros((len(riffs), n, width, 2), dtype=np.int64)
+    valid = np.zeros((len(riffs), n, width), dtype=bool)
+    ref = np.zeros((len(riffs), n), dtype=np.int64)
+    pad = np.zeros((len(riffs), n), dtype=bool)
+    for b, (p, v, r) in enumerate(riffs):
+        length = len(r)
+        positions[b, :length], valid[b, :length], ref[b, :length] = p, v, r
+        positions[b, length:], valid[b, length:], ref[b, length:] = p[-1], v[-1], r[-1]
+        pad[b, length:] = True
+    return positions, valid, ref, pad
+
+
+def evaluate_chunk(riffs, weights):
+    """
+    Solves a group of encoded riffs under every weight vector at once.
+    Returns per-config sums: correct notes, exactly matching riffs and
+    regret (reference cost minus optimal cost), plus the note count.
+
+    Ties between equally cheap fingerings are broken like astar_search.
+    """
+    positions, valid, ref, pad = _stack_chunk(riffs)
+    count, n, width = valid.shape
+    configs = len(weights)
+
+    w = {name: weights[:, k].reshape(1, configs, 1, 1) for k, name in enumerate(WEIGHTS)}
+    stay = np.where(np.eye(width, dtype=bool), 0.0, np.inf)
+    batch = np.arange(count)[:, None]
+    config = np.arange(configs)[None, :]
+
+    # First-note base cost included so float ties match the search engines
+    g = np.where(valid[:, 0], 1.0, np.inf)[:, None, :].repeat(configs, axis=1)
+    rank, rank_of = _initial_rank(g)
+    ref_cost = np.ones((count, configs))
+    backpointers = []
+
+    for i in range(1, n):
+        strings, frets = positions[:, i, :, 0], positions[:, i, :, 1]
+        prev_strings, prev_frets = positions[:, i - 1, :, 0], positions[:, i - 1, :, 1]
+        fret_diff = np.abs(prev_frets[:, :, None] - frets[:, None, :])[:, None]
+        string_diff = np.abs(prev_strings[:, :, None] - strings[:, None, :])[:, None]
+        to_open = (frets == 0)[:, None, None, :]
+
+        # Same arithmetic as the transition table plus path_cost's penalty
+        cost = fret_diff * w["FRET_STRETCH_WEIGHT"] + string_diff * w["STRING_CHANGE_WEIGHT"]
+        penalty = fret_diff > w["MAX_REACHABLE_STRETCH"]
+        cost = np.where(penalty, cost + w["ANATOMICAL_PENALTY"],
+                        cost + np.where(to_open, w["OPEN_STRING_BONUS"], 0.0))
+        cost = np.maximum(1.0, cost)
+        cost = np.where(penalty, cost + STEP_PENALTY, cost)
+
+        allowed = valid[:, i - 1, :, None] & valid[:, i, None, :]
+        cost = np.where(allowed[:, None], cost, np.inf)
+        cost = np.where(pad[:, i, None, None, None], stay, cost)
+
+        bp, g, rank, rank_of = _advance_layer(g, rank, rank_of, cost)
+        backpointers.append(bp.astype(np.uint8))
+
+        ref_cost += cost[batch, config, ref[:, i - 1, None], ref[:, i, None]]
+
+    # The first goal A* would pop
+    j = rank[:, :, 0]
+    best = np.take_along_axis(g, j[:, :, None], axis=2)[:, :, 0]
+
+    correct = np.zeros((count, configs), dtype=np.int64)
+    real = ~pad
+    for i in range(n - 1, -1, -1):
+        correct += (j == ref[:, i, None]) & real[:, i, None]
+        if i > 0:
+            j = np.take_along_axis(backpointers[i - 1], j[:, :, None], axis=2)[:, :, 0]
+
+    lengths = real.sum(axis=1)
+    return {
+        "correct_notes": correct.sum(axis=0),
+        "exact": (correct == lengths[:, None]).sum(axis=0),
+        "regret": (ref_cost - best).sum(axis=0),
+        "notes": int(lengths.sum()),
+        "riffs": count,
+    }
+
+
+def _initial_rank(g):
+    """Batched search_viterbi.initial_rank over the last axis."""
+    rank = np.argsort(g, axis=-1, kind="stable")
+    rank_of = np.empty_like(rank)
+    np.put_along_axis(rank_of, rank, np.arange(g.shape[-1]), axis=-1)
+    return rank, rank_of
+
+
+def _advance_layer(g, rank, rank_of, cost):
+    """
+    Batched search_viterbi.advance_layer: g, rank and rank_of are
+    (..., k) arrays, cost is (..., k, m). Ties go to the predecessor A*
+    expands first, so every config returns the path the engines return.
+    """
+    total = g[..., :, None] + cost
+    ordered = np.take_along_axis(total, rank[..., :, None], axis=-2)
+    bp = np.take_along_axis(rank, np.argmin(ordered, axis=-2), axis=-1)
+    new_g = np.take_along_axis(total, bp[..., None, :], axis=-2)[..., 0, :]
+
+    columns = np.broadcast_to(np.arange(cost.shape[-1]), new_g.shape)
+    order = np.lexsort((columns, np.take_along_axis(rank_of, bp, axis=-1), new_g))
+    new_rank_of = np.empty_like(order)
+    np.put_along_axis(new_rank_of, order, columns, axis=-1)
+    return bp, new_g, order, new_rank_of
+
+
+def _init_worker(weights):
+    global _weights
+    _weights = weights
+
+
+def _evaluate_task(riffs):
+    return evaluate_chunk(riffs, _weights)
+
+
+def _chunks(encoded, configs, width, max_elements):
+    """Groups riffs of similar length so one DP step stays under max_elements values."""
+    size = max(1, max_elements // (configs * width * width))
+    ordered = sorted(encoded, key=lambda riff: len(riff[2]))
+    for start in range(0, len(ordered), size):
+        yield ordered[start:start + size]
+
+
+def calibrate(corpus, weights, workers=None, mapper=None, max_elements=2_000_000):
+    """
+    Scores every weight vector (rows of weights, in WEIGHTS order) against
+    a corpus of (riff, reference fingering) pairs and returns a report:
+
+        {"configs", "riffs", "notes", "note_accuracy", "exact_match",
+         "mean_regret", "ranking", "best"}
+
+    note_accuracy / exact_match / mean_regret are arrays with one value
+    per config; ranking orders configs by accuracy, then regret. Riff
+    groups are spread over a process pool (workers=0 runs in-process).
+    """
+    mapper = mapper or NoteMapper()
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if weights.shape[1] != len(WEIGHTS):
+        raise ValueError(f"Weight vectors need {len(WEIGHTS)} values ({', '.join(WEIGHTS)})")
+
+    encoded = encode_corpus(corpus, mapper)
+    if not encoded:
+        raise ValueError("Empty corpus")
+    chunks = _chunks(encoded, len(weights), mapper.num_strings, max_elements)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 0:
+        results = [evaluate_chunk(chunk, weights) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(weights,)) as executor:
+            results = list(executor.map(_evaluate_task, chunks))
+
+    notes = sum(r["notes"] for r in results)
+    riffs = sum(r["riffs"] for r in results)
+    accuracy = sum(r["correct_notes"] for r in results) / notes
+    exact = sum(r["exact"] for r in results) / riffs
+    regret = sum(r["regret"] for r in results) / notes
+
+    ranking = np.lexsort((regret, -accuracy))
+    best = int(ranking[0])
+    return {
+        "configs": len(weights),
+        "riffs": riffs,
+        "notes": notes,
+        "note_accuracy": accuracy,
+        "exact_match": exact,
+        "mean_regret": regret,
+        "ranking": ranking,
+        "best": {
+            "index": best,
+            "weights": dict(zip(WEIGHTS, weights[best].tolist())),
+            "note_accuracy": float(accuracy[best]),
+            "exact_match": float(exact[best]),
+            "mean_regret": float(regret[best]),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core_ai.calibration", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="JSONL with riff and reference fingering per line")
+    parser.add_argument("--configs", type=int, default=1000, help="random weight vectors to try")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-i", "--instrument", choices=list(INSTRUMENTS), default="standard")
+    parser.add_argument("--top", type=int, default=10, help="configs listed in the report")
+    parser.add_argument("-o", "--output", help="write the report JSON here (default stdout)")
+    args = parser.parse_args(argv)
+
+    # Always score the current defaults too, as config 0
+    weights = np.vstack([[list(default_weights().values())],
+                         random_weights(args.configs, args.seed)])
+    report = calibrate(load_corpus(args.corpus), weights, args.workers,
+                       NoteMapper(instrument=args.instrument))
+
+    top = [{"index": int(i),
+            "weights": dict(zip(WEIGHTS, weights[i].tolist())),
+            "note_accuracy": float(report["note_accuracy"][i]),
+            "exact_match": float(report["exact_match"][i]),
+            "mean_regret": float(report["mean_regret"][i])}
+           for i in report["ranking"][:args.top]]
+    text = json.dumps({
+        "configs": report["configs"], "riffs": report["riffs"], "notes": report["notes"],
+        "defaults": {"note_accuracy": float(report["note_accuracy"][0]),
+                     "exact_match": float(report["exact_match"][0])},
+        "best": report["best"], "top": top,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
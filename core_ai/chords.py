@@ -0,0 +1,197 @@
+import re
+import numpy as np
+
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import initial_rank, advance_layer
+
+# A riff token is either a single note or a bracketed group of notes
+TOKEN_PATTERN = re.compile(r"\[([^\]]*)\]|(\S+)")
+
+
+def parse_riff(text):
+    """
+    Splits riff text into events. Single notes stay strings, simultaneous
+    notes written as [E2 B2 E3] become tuples: 'A2 [E2 B2] D3' ->
+    ['A2', ('E2', 'B2'), 'D3'].
+    """
+    events = []
+    for group, single in TOKEN_PATTERN.findall(text):
+        if single:
+            events.append(single)
+        else:
+            notes = tuple(group.split())
+            if len(notes) == 1:
+                events.append(notes[0])
+            elif notes:
+                events.append(notes)
+    return events
+
+
+def format_riff(riff):
+    """Inverse of parse_riff: ['A2', ('E2', 'B2')] -> 'A2 [E2 B2]'."""
+    return " ".join(f"[{' '.join(event)}]" if is_chord(event) else event for event in riff)
+
+
+def is_chord(event):
+    return isinstance(event, (tuple, list))
+
+
+def has_chords(riff):
+    return any(is_chord(event) for event in riff)
+
+
+def event_notes(event):
+    """Returns the note names of an event as a tuple."""
+    return tuple(event) if is_chord(event) else (event,)
+
+
+def event_positions(entry):
+    """Returns the (string, fret) positions of a solved path entry as a list."""
+    if entry and isinstance(entry[0], tuple):
+        return list(entry)
+    return [entry]
+
+
+def shape_anchor(entry):
+    """
+    Hand reference point of a path entry: the note on the thickest
+    (highest numbered) string. A single note is its own anchor.
+    """
+    return max(event_positions(entry))
+
+
+def shape_span(entry):
+    """Fretted span of a path entry; open strings don't count."""
+    frets = [f for _, f in event_positions(entry) if f > 0]
+    return max(frets) - min(frets) if frets else 0
+
+
+class ChordShapeIndex:
+    """
+    Cached index from a pitch set to its playable chord shapes.
+
+    A shape puts every note on its own string with a fretted span of at
+    most MAX_REACHABLE_STRETCH (open strings don't count). Shapes are
+    enumerated by backtracking with span pruning, scored by their fretted
+    span and kept cheapest first, so a repeated chord costs a dict lookup.
+    """
+
+    MAX_SHAPES = 32
+
+    def __init__(self, mapper, evaluator):
+        self.mapper = mapper
+        self.evaluator = evaluator
+        self._shapes = {}
+        self._signature = None
+
+    def shapes(self, midi_values):
+        """
+        Returns [(shape, score)] for a tuple of MIDI values, where shape
+        lists one (string, fret) per value in the given order.
+        """
+        signature = (self.evaluator.MAX_REACHABLE_STRETCH,
+                     self.evaluator.FRET_STRETCH_WEIGHT,
+                     tuple(sorted(self.mapper.tuning.items())),
+                     self.mapper.num_frets)
+        if signature != self._signature:
+            self._shapes.clear()
+            self._signature = signature
+
+        key = tuple(sorted(midi_values))
+        if key not in self._shapes:
+            self._shapes[key] = self._enumerate(key)
+
+        # Reorder each cached shape to follow the caller's note order
+        order = sorted(range(len(midi_values)), key=lambda i: midi_values[i])
+        inverse = [0] * len(order)
+        for rank, i in enumerate(order):
+            inverse[i] = rank
+        return [(tuple(shape[r] for r in inverse), score)
+                for shape, score in self._shapes[key]]
+
+    def _enumerate(self, sorted_midi):
+        max_span = self.evaluator.MAX_REACHABLE_STRETCH
+        candidates = [self.mapper.find_positions_on_fretboard(m) for m in sorted_midi]
+        shapes = []
+
+        def place(i, used, low, high, chosen):
+            if i == len(candidates):
+                shape = tuple(chosen)
+                shapes.append((shape, shape_span(shape) * self.evaluator.FRET_STRETCH_WEIGHT))
+                return
+            for string, fret in candidates[i]:
+                if string in used:
+                    continue
+                new_low, new_high = low, high
+                if fret > 0:
+                    new_low, new_high = min(low, fret), max(high, fret)
+                    if new_high - new_low > max_span:
+                        continue
+                chosen.append((string, fret))
+                used.add(string)
+                place(i + 1, used, new_low, new_high, chosen)
+                used.discard(string)
+                chosen.pop()
+
+        place(0, set(), float("inf"), float("-inf"), [])
+        shapes.sort(key=lambda item: item[1])
+        return shapes[:self.MAX_SHAPES]
+
+
+def solve_events(riff, problem=None, shape_index=None, progress=None):
+    """
+    Layered Viterbi over riff events, each event being a single note or a
+    chord. Every event is a layer of shapes; moving between shapes costs
+    path_cost between their anchors plus the target shape's score, so
+    single-note riffs cost exactly what astar_search computes.
+    Returns (path, search_total); path entries are (string, fret) for
+    single notes and tuples of them for chords. Unplayable -> ([], None).
+    A Progress is updated once per event (and may cancel the solve).
+    """
+    problem = problem or GuitarPathProblem([])
+    shape_index = shape_index or ChordShapeIndex(problem.mapper, problem.cost_calculator)
+
+    layers = []
+    for event in riff:
+        midi_values = tuple(problem.mapper.note_to_midi(n) for n in event_notes(event))
+        if None in midi_values:
+            return [], None
+        if is_chord(event):
+            shapes = shape_index.shapes(midi_values)
+        else:
+            shapes = [(p, 0.0) for p in problem.mapper.find_positions_on_fretboard(midi_values[0])]
+        if not shapes:
+            return [], None
+        anchors = np.array([shape_anchor(shape) for shape, _ in shapes], dtype=np.int64)
+        scores = np.array([score for _, score in shapes])
+        layers.append(([shape for shape, _ in shapes], anchors, scores))
+
+    if not layers:
+        return [], None
+
+    start = problem.initial
+    shapes, anchors, scores = layers[0]
+    g = np.array([problem.path_cost(0, start, (s, f, 0), (s, f, 0))
+                  for s, f in anchors.tolist()]) + scores
+    rank, rank_of = initial_rank(g)
+    indices = problem.layer_indices(anchors)
+
+    backpointers = []
+    for i, (shapes, next_anchors, scores) in enumerate(layers[1:], 2):
+        if progress is not None:
+            progress.update(i, len(layers), "events")
+        next_indices = problem.layer_indices(next_anchors)
+        cost = problem.index_cost_matrix(indices, next_indices) + scores[None, :]
+        bp, g, rank, rank_of = advance_layer(g, rank, rank_of, cost)
+        backpointers.append(bp.astype(np.uint8))
+        indices = next_indices
+
+    j = int(rank[0])
+    total = float(g[j])
+    indices = [j]
+    for bp in reversed(backpointers):
+        j = int(bp[j])
+        indices.append(j)
+    indices.reverse()
+
+    return [layer[0][idx] for layer, idx in zip(layers, indices)], total
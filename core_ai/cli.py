@@ -0,0 +1,139 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+
+from core_ai.api import ENGINES
+from core_ai.batch import run_fingering_batch
+from core_ai.chords import parse_riff, format_riff
+from core_ai.instruments import INSTRUMENTS
+
+MIDI_EXTENSIONS = (".mid", ".midi")
+MUSICXML_EXTENSIONS = (".xml", ".musicxml", ".mxl")
+METRIC_KEYS = ("stretch", "string", "pos", "penalty_count", "total")
+
+
+def read_text_riffs(stream, source):
+    """Yields (source, riff) for every non-empty line, one riff per line."""
+    for line_number, line in enumerate(stream, 1):
+        riff = parse_riff(line)
+        if riff:
+            yield f"{source}:{line_number}", riff
+
+
+def read_score_riffs(path):
+    """
+    Yields (source, riff) for every part of a MIDI or MusicXML file.
+    Chords become simultaneous events; rests are skipped.
+    """
+    from music21 import converter
+
+    score = converter.parse(path)
+    parts = score.parts if score.parts else [score]
+    for part_number, part in enumerate(parts, 1):
+        riff = []
+        for element in part.flatten().notes:
+            if element.isChord:
+                riff.append(tuple(p.nameWithOctave for p in element.pitches))
+            else:
+                riff.append(element.pitch.nameWithOctave)
+        if riff:
+            yield f"{path}#part{part_number}", riff
+
+
+def read_riffs(inputs):
+    """Lazily yields (source, riff) from every input path ('-' is stdin)."""
+    for path in inputs:
+        if path == "-":
+            yield from read_text_riffs(sys.stdin, "stdin")
+            continue
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension in MIDI_EXTENSIONS or extension in MUSICXML_EXTENSIONS:
+            yield from read_score_riffs(path)
+        else:
+            with open(path, encoding="utf-8") as stream:
+                yield from read_text_riffs(stream, path)
+
+
+def solve_stream(inputs, workers=0, engine="astar", chunksize=64, cache_path=None,
+                 instrument="standard"):
+    """
+    Yields (source, record) pairs in input order. Only riffs that are in
+    flight are remembered, so memory stays flat on huge inputs.
+    """
+    sources = deque()
+
+    def riffs():
+        for source, riff in read_riffs(inputs):
+            sources.append(source)
+            yield riff
+
+    for record in run_fingering_batch(riffs(), workers=workers, chunksize=chunksize,
+                                      engine=engine, cache_path=cache_path,
+                                      instrument=instrument):
+        yield sources.popleft(), record
+
+
+def write_jsonl(results, out, metrics):
+    for source, record in results:
+        row = {"index": record["index"], "source": source,
+               "riff": format_riff(record["riff"]), "path": record["path"]}
+        if metrics:
+            row["analysis"] = record["analysis"]
+        if record["error"]:
+            row["error"] = record["error"]
+        out.write(json.dumps(row) + "\n")
+
+
+def write_csv(results, out, metrics):
+    writer = csv.writer(out)
+    header = ["index", "source", "riff", "path"]
+    if metrics:
+        header += list(METRIC_KEYS)
+    writer.writerow(header + ["error"])
+
+    for source, record in results:
+        row = [record["index"], source, format_riff(record["riff"]),
+               json.dumps(record["path"])]
+        if metrics:
+            analysis = record["analysis"] or {}
+            row += [analysis.get(key, "") for key in METRIC_KEYS]
+        error = record["error"]["message"] if record["error"] else ""
+        writer.writerow(row + [error])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m core_ai",
+        description="Headless guitar fingering solver. Reads riffs from text files "
+                    "(one riff per line, chords as [E2 B2]), MIDI or MusicXML and "
+                    "writes one result per riff.")
+    parser.add_argument("inputs", nargs="*", default=["-"],
+                        help="input files, '-' for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default stdout)")
+    parser.add_argument("-f", "--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="worker processes, 0 solves in-process (default)")
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES), default="astar")
+    parser.add_argument("-i", "--instrument", choices=list(INSTRUMENTS), default="standard",
+                        help="tuning / instrument (default standard 6-string)")
+    parser.add_argument("-m", "--metrics", action="store_true",
+                        help="include the cost breakdown of every fingering")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--cache", metavar="PATH",
+                        help="SQLite result cache shared across runs and workers")
+    args = parser.parse_args(argv)
+
+    results = solve_stream(args.inputs, args.workers, args.engine, args.chunksize, args.cache,
+                           args.instrument)
+    write = write_csv if args.format == "csv" else write_jsonl
+
+    if args.output == "-":
+        write(results, sys.stdout, args.metrics)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            write(results, out, args.metrics)
+    return 0
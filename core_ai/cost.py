@@ -1,9 +1,32 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Transition tables shared by every ErgonomicCost with the same board size
+# and weights, most recently used last
+_TABLES = OrderedDict()
+MAX_SHARED_TABLES = 32
+
+
 class ErgonomicCost:
     """
     Calculates the physical effort required to move between two fretboard positions.
     """
 
-    def __init__(self):
+    # Changing any of these invalidates the precomputed transition table
+    WEIGHT_ATTRIBUTES = (
+        "FRET_STRETCH_WEIGHT",
+        "STRING_CHANGE_WEIGHT",
+        "OPEN_STRING_BONUS",
+        "MAX_REACHABLE_STRETCH",
+        "ANATOMICAL_PENALTY",
+    )
+
+    def __init__(self, num_strings=6, num_frets=22):
+        self.num_strings = num_strings
+        self.num_frets = num_frets
+        self._table = None
+
         self.FRET_STRETCH_WEIGHT = 1.0
         self.STRING_CHANGE_WEIGHT = 2.0
         self.OPEN_STRING_BONUS = -0.5
@@ -12,6 +35,11 @@ class ErgonomicCost:
         # Penalty applied ONCE for anatomical violations
         self.ANATOMICAL_PENALTY = 15.0
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self.WEIGHT_ATTRIBUTES or name in ("num_strings", "num_frets"):
+            super().__setattr__("_table", None)
+
     def calculate_step_cost(self, pos1, pos2):
         """
         Calculates ergonomic movement cost between two positions.
@@ -45,3 +73,110 @@ class ErgonomicCost:
         """
         f1, f2 = pos1[1], pos2[1]
         return abs(f1 - f2) <= self.MAX_REACHABLE_STRETCH
+
+    def covers(self, num_strings, num_frets):
+        """True if the tables of this model include every position of that board."""
+        return num_strings <= self.num_strings and num_frets <= self.num_frets
+
+    def sized_for(self, num_strings, num_frets):
+        """
+        This model if it covers a num_strings x num_frets board, otherwise a
+        copy with the same weights whose tables do.
+        """
+        if self.covers(num_strings, num_frets):
+            return self
+        resized = ErgonomicCost(max(num_strings, self.num_strings),
+                                max(num_frets, self.num_frets))
+        for name in self.WEIGHT_ATTRIBUTES:
+            setattr(resized, name, getattr(self, name))
+        return resized
+
+    def transition_table(self):
+        """
+        Dense tables over every pair of board positions, built once per
+        board size and weight configuration and shared between instances.
+        Rows are 'from', columns are 'to', indexed by position_indices.
+        Keys: cost, penalty, stretch, string_shift. Treat as read-only.
+        """
+        if self._table is None:
+            signature = (self.num_strings, self.num_frets,
+                         tuple(getattr(self, name) for name in self.WEIGHT_ATTRIBUTES))
+            table = _TABLES.get(signature)
+            if table is None:
+                table = self._build_transition_table()
+                _TABLES[signature] = table
+                if len(_TABLES) > MAX_SHARED_TABLES:
+                    _TABLES.popitem(last=False)
+            else:
+                _TABLES.move_to_end(signature)
+            self._table = table
+        return self._table
+
+    def _build_transition_table(self):
+        strings = np.repeat(np.arange(1, self.num_strings + 1), self.num_frets + 1)
+        frets = np.tile(np.arange(self.num_frets + 1), self.num_strings)
+
+        fret_diff = np.abs(frets[:, None] - frets[None, :])
+        string_diff = np.abs(strings[:, None] - strings[None, :])
+
+        stretch = fret_diff * self.FRET_STRETCH_WEIGHT
+        string_shift = string_diff * self.STRING_CHANGE_WEIGHT
+        penalty = fret_diff > self.MAX_REACHABLE_STRETCH
+
+        # Same arithmetic as calculate_step_cost, one whole table at a time
+        bonus = np.where(frets[None, :] == 0, self.OPEN_STRING_BONUS, 0.0)
+        cost = stretch + string_shift
+        cost = np.where(penalty, cost + self.ANATOMICAL_PENALTY, cost + bonus)
+        cost = np.maximum(1.0, cost)
+
+        return {
+            "cost": cost,
+            "penalty": penalty,
+            "stretch": stretch,
+            "string_shift": string_shift,
+        }
+
+    def position_indices(self, positions):
+        """
+        Maps an array of (string, fret) pairs (shape (..., 2)) to table indices.
+        Raises ValueError for positions outside this model's board.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        strings, frets = positions[..., 0], positions[..., 1]
+        if positions.size and (strings.min() < 1 or strings.max() > self.num_strings or
+                               frets.min() < 0 or frets.max() > self.num_frets):
+            raise ValueError(f"Positions outside the {self.num_strings}-string, "
+                             f"{self.num_frets}-fret board of this cost model")
+        return self.board_indices(positions)
+
+    def board_indices(self, positions):
+        """
+        position_indices without the bounds check, for callers whose
+        positions are known to be on this model's board (see sized_for).
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        return (positions[..., 0] - 1) * (self.num_frets + 1) + positions[..., 1]
+
+    def step_costs(self, from_positions, to_positions):
+        """
+        Vectorized calculate_step_cost. Both arguments are arrays of
+        (string, fret) pairs and broadcast against each other.
+        """
+        table = self.transition_table()
+        return table["cost"][self.position_indices(from_positions),
+                             self.position_indices(to_positions)]
+
+    def step_penalties(self, from_positions, to_positions):
+        """Vectorized 'not is_physically_possible'."""
+        table = self.transition_table()
+        return table["penalty"][self.position_indices(from_positions),
+                                self.position_indices(to_positions)]
+
+    def step_components(self, from_positions, to_positions):
+        """
+        Vectorized lookup of every table component for the given transitions.
+        """
+        table = self.transition_table()
+        rows = self.position_indices(from_positions)
+        cols = self.position_indices(to_positions)
+        return {key: values[rows, cols] for key, values in table.items()}
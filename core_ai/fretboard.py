@@ -1,12 +1,19 @@
+from core_ai.instruments import get_instrument
+
+
 class Fretboard:
     """
     Represents the physical dimensions and properties of the guitar fretboard.
     Acts as the environment for the AI agent.
     """
 
-    def __init__(self, num_frets=22):
-        self.num_strings = 6
-        self.num_frets = num_frets  # Standard range is usually 22 or 24
+    def __init__(self, num_frets=None, instrument="standard"):
+        # Board size comes from the instrument registry (6 strings, 22 frets
+        # for "standard"); num_frets overrides the fret count
+        self.instrument = get_instrument(instrument, num_frets)
+        self.num_strings = self.instrument.num_strings
+        self.num_frets = self.instrument.num_frets  # Standard range is usually 22 or 24
+        self.string_names = self.instrument.string_names
 
     def is_valid_position(self, string, fret):
         """
@@ -0,0 +1,182 @@
+import numpy as np
+
+from core_ai.api import calculate_final_metrics
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import initial_rank, advance_layer
+
+
+class IncrementalSolver:
+    """
+    Re-solves an edited riff by reusing the DP tables of the previous solve.
+
+    Forward Viterbi columns are cached per riff prefix and backward
+    cost-to-go columns per riff suffix. An edit at note i only recomputes
+    the layers between the still-valid prefix and suffix, and appending
+    notes only computes the new forward layers.
+
+    The total cost always equals a full solve. When several fingerings tie,
+    the part after an edit can pick a different (equally cheap) one.
+    """
+
+    def __init__(self, mapper=None, cost_calculator=None):
+        self.problem = GuitarPathProblem([], mapper, cost_calculator)
+        self.mapper = self.problem.mapper
+        self.evaluator = self.problem.cost_calculator
+        self.riff = []
+        # Per layer from the start: (note, positions, g, rank, rank_of, bp)
+        self.forward = []
+        # Per layer from the END: (note, positions, cost_to_go, successor)
+        self.backward = []
+        # note name -> (candidate positions, their table indices)
+        self._layers = {}
+
+    def solve(self, riff, progress=None):
+        """
+        Same contract as run_fingering_algorithm: returns (path, analysis).
+        A Progress is updated per recomputed layer; a cancelled solve
+        leaves only complete layers cached, so the next solve is correct.
+        """
+        riff = list(riff)
+        if not riff:
+            return [], {"total": 0}
+
+        n = len(riff)
+        previous = self.riff
+        self.riff = riff
+
+        forward_valid = _common_prefix(riff, [layer[0] for layer in self.forward])
+        backward_valid = _common_prefix(riff[::-1], [layer[0] for layer in self.backward])
+        del self.forward[forward_valid:]
+        del self.backward[backward_valid:]
+
+        # Layer where the forward and backward passes meet
+        extends_previous = n > len(previous) and riff[:len(previous)] == previous
+        if forward_valid >= n or extends_previous:
+            meet = n - 1
+        else:
+            meet = forward_valid
+
+        todo = (meet + 1 - forward_valid) + max(0, n - backward_valid - 1 - meet)
+        done = 0
+
+        for i in range(forward_valid, meet + 1):
+            if progress is not None:
+                progress.update(done, todo, "layers")
+            if not self._extend_forward(riff[i]):
+                return self._fail()
+            done += 1
+
+        for i in range(n - backward_valid - 1, meet, -1):
+            if progress is not None:
+                progress.update(done, todo, "layers")
+            if not self._extend_backward(riff[i]):
+                return self._fail()
+            done += 1
+
+        path = self._trace(meet, n)
+        analysis = calculate_final_metrics(path, self.evaluator)
+        return path, analysis
+
+    def _layer(self, note_name):
+        """(positions, table indices) of a note's candidates, or None if unplayable."""
+        layer = self._layers.get(note_name)
+        if layer is None:
+            midi_val = self.mapper.note_to_midi(note_name)
+            if midi_val is None:
+                return None
+            positions = self.mapper.find_positions_on_fretboard(midi_val)
+            if not positions:
+                return None
+            positions = np.array(positions, dtype=np.int64)
+            layer = self._layers[note_name] = (positions, self.problem.layer_indices(positions))
+        return layer
+
+    def _cost(self, from_note, to_note):
+        return self.problem.index_cost_matrix(self._layer(from_note)[1], self._layer(to_note)[1])
+
+    def _extend_forward(self, note_name):
+        layer = self._layer(note_name)
+        if layer is None:
+            return False
+        positions = layer[0]
+
+        if not self.forward:
+            start = self.problem.initial
+            g = np.array([self.problem.path_cost(0, start, (s, f, 0), (s, f, 0))
+                          for s, f in positions.tolist()])
+            rank, rank_of = initial_rank(g)
+            bp = None
+        else:
+            prev_note, _, prev_g, prev_rank, prev_rank_of, _ = self.forward[-1]
+            cost = self._cost(prev_note, note_name)
+            bp, g, rank, rank_of = advance_layer(prev_g, prev_rank, prev_rank_of, cost)
+            bp = bp.astype(np.uint8)
+
+        self.forward.append((note_name, positions, g, rank, rank_of, bp))
+        return True
+
+    def _extend_backward(self, note_name):
+        layer = self._layer(note_name)
+        if layer is None:
+            return False
+        positions = layer[0]
+
+        if not self.backward:
+            cost_to_go = np.zeros(len(positions))
+            successor = None
+        else:
+            next_note, _, next_cost, _ = self.backward[-1]
+            total = self._cost(note_name, next_note) + next_cost[None, :]
+            successor = np.argmin(total, axis=1).astype(np.uint8)
+            cost_to_go = total[np.arange(len(positions)), successor]
+
+        self.backward.append((note_name, positions, cost_to_go, successor))
+        return True
+
+    def _trace(self, meet, n):
+        note_name, _, g, rank, _, _ = self.forward[meet]
+
+        if meet == n - 1:
+            j = int(rank[0])
+        else:
+            # Layer meet + 1 is stored n - meet - 2 entries from the end
+            next_note, _, next_cost, _ = self.backward[n - meet - 2]
+            through = self._cost(note_name, next_note) + next_cost[None, :]
+            total = g + np.min(through, axis=1)
+            # Ties follow the forward layer's A* pop order
+            j = int(rank[np.argmin(total[rank])])
+
+        path = []
+        index = j
+        for _, layer_positions, _, _, _, bp in reversed(self.forward[:meet + 1]):
+            s, f = layer_positions[index]
+            path.append((int(s), int(f)))
+            if bp is not None:
+                index = int(bp[index])
+        path.reverse()
+
+        if meet < n - 1:
+            index = int(np.argmin(through[j]))
+            for _, layer_positions, _, successor in reversed(self.backward[:n - meet - 1]):
+                s, f = layer_positions[index]
+                path.append((int(s), int(f)))
+                if successor is not None:
+                    index = int(successor[index])
+
+        return path
+
+    def _fail(self):
+        # Unplayable note: behave like run_fingering_algorithm and start over
+        self.riff = []
+        self.forward.clear()
+        self.backward.clear()
+        return [], {"total": 0}
+
+
+def _common_prefix(a, b):
+    count = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        count += 1
+    return count
@@ -0,0 +1,108 @@
+"""
+Registry of tuned fretted instruments. NoteMapper, Fretboard,
+ErgonomicCost and the GUI all take their string count, tuning and fret
+count from here, so switching tunings is a dictionary lookup.
+"""
+
+# Sharp spellings used for string labels
+LABEL_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+
+class Instrument:
+    """
+    A tuned fretted instrument. tuning maps string number to open-string
+    MIDI value, string 1 being the highest. The MIDI -> positions index is
+    built once, on first use, and shared by every NoteMapper using it.
+    """
+
+    def __init__(self, name, tuning, num_frets=22):
+        self.name = name
+        self.tuning = dict(tuning)
+        self.num_frets = num_frets
+        self.num_strings = len(self.tuning)
+        if sorted(self.tuning) != list(range(1, self.num_strings + 1)):
+            raise ValueError(f"Strings of {name} must be numbered 1..{self.num_strings}")
+        self._position_index = None
+
+    @property
+    def string_names(self):
+        return {s: LABEL_NAMES[midi % 12] for s, midi in self.tuning.items()}
+
+    def position_index(self):
+        """{midi: ((string, fret), ...)} for every playable MIDI value (read-only)."""
+        if self._position_index is None:
+            self._position_index = build_position_index(self.tuning, self.num_frets)
+        return self._position_index
+
+    def cost_model(self):
+        """A fresh ErgonomicCost sized for this board (its tables are shared)."""
+        from core_ai.cost import ErgonomicCost
+
+        return ErgonomicCost(num_strings=self.num_strings, num_frets=self.num_frets)
+
+    def with_frets(self, num_frets):
+        return get_instrument(self.name, num_frets)
+
+    def __repr__(self):
+        return f"Instrument({self.name!r}, strings={self.num_strings}, frets={self.num_frets})"
+
+
+def build_position_index(tuning, num_frets):
+    index = {}
+    low = min(tuning.values())
+    high = max(tuning.values()) + num_frets
+    for midi_value in range(low, high + 1):
+        index[midi_value] = tuple(
+            (string_num, midi_value - open_midi)
+            for string_num, open_midi in tuning.items()
+            if 0 <= midi_value - open_midi <= num_frets
+        )
+    return index
+
+
+INSTRUMENTS = {}
+# Fret-count variants of registered instruments, built on demand
+_variants = {}
+
+
+def register_instrument(name, tuning, num_frets=22):
+    """Adds (or replaces) a named instrument and returns it."""
+    instrument = Instrument(name, tuning, num_frets)
+    INSTRUMENTS[name] = instrument
+    for key in [key for key in _variants if key[0] == name]:
+        del _variants[key]
+    return instrument
+
+
+def get_instrument(name="standard", num_frets=None):
+    """
+    The registered instrument, or a cached variant of it with another
+    fret count. Raises ValueError for unknown names.
+    """
+    if isinstance(name, Instrument):
+        instrument = name
+    elif name in INSTRUMENTS:
+        instrument = INSTRUMENTS[name]
+    else:
+        raise ValueError(f"Unknown instrument: {name} (known: {', '.join(INSTRUMENTS)})")
+
+    if num_frets is None or num_frets == instrument.num_frets:
+        return instrument
+
+    key = (instrument.name, num_frets)
+    variant = _variants.get(key)
+    if variant is None or variant.tuning != instrument.tuning:
+        variant = Instrument(instrument.name, instrument.tuning, num_frets)
+        _variants[key] = variant
+    return variant
+
+
+register_instrument("standard", {1: 64, 2: 59, 3: 55, 4: 50, 5: 45, 6: 40})
+register_instrument("drop_d", {1: 64, 2: 59, 3: 55, 4: 50, 5: 45, 6: 38})
+register_instrument("dadgad", {1: 62, 2: 57, 3: 55, 4: 50, 5: 45, 6: 38})
+register_instrument("open_g", {1: 62, 2: 59, 3: 55, 4: 50, 5: 43, 6: 38})
+register_instrument("seven_string", {1: 64, 2: 59, 3: 55, 4: 50, 5: 45, 6: 40, 7: 35}, 24)
+register_instrument("eight_string",
+                    {1: 64, 2: 59, 3: 55, 4: 50, 5: 45, 6: 40, 7: 35, 8: 30}, 24)
+register_instrument("bass", {1: 43, 2: 38, 3: 33, 4: 28}, 20)
+register_instrument("bass_5", {1: 43, 2: 38, 3: 33, 4: 28, 5: 23}, 24)
@@ -0,0 +1,193 @@
+import heapq
+import numpy as np
+
+from core_ai.search_viterbi import candidate_layers, viterbi_search
+
+
+class _HeapNode:
+    """Node of a persistent leftist min-heap of sidetracks."""
+
+    __slots__ = ("key", "elem", "left", "right", "rank")
+
+    def __init__(self, key, elem, left=None, right=None):
+        self.key = key
+        self.elem = elem
+        self.left = left
+        self.right = right
+        self.rank = 1 + (right.rank if right else 0)
+
+
+def _merge(a, b):
+    """Merges two persistent leftist heaps without modifying either."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b.key < a.key:
+        a, b = b, a
+    merged = _merge(a.right, b)
+    left = a.left
+    if (left.rank if left else 0) < merged.rank:
+        left, merged = merged, left
+    return _HeapNode(a.key, a.elem, left, merged)
+
+
+class KBestFingerings:
+    """
+    Lazily enumerates distinct fingerings of a riff in increasing total cost.
+
+    Eppstein-style k shortest paths on the layered note graph: one backward
+    pass gives the exact cost-to-go of every candidate position, every
+    other fingering is described by its "sidetracks" (edges leaving the
+    optimal continuation), and persistent heaps of sidetracks let each
+    further alternative be produced in roughly O(log n) heap work plus the
+    path reconstruction. The first fingering is viterbi_search's, which is
+    also astar_search's with the uniform heuristic; other solvers may
+    return a different fingering of the same cost.
+
+    Uses the same cost model as GuitarPathProblem.path_cost.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.layers = candidate_layers(problem) or []
+        self.positions = [np.array([(s, f) for s, f, _ in layer], dtype=np.int64)
+                          for layer in self.layers]
+        if not self.layers:
+            return
+
+        n = len(self.layers)
+        start = problem.initial
+        first_costs = np.array([problem.path_cost(0, start, a, a) for a in self.layers[0]])
+
+        # Backward pass: cost_to_go[i][j] = cheapest cost from candidate j of layer i
+        self.cost_to_go = [None] * n
+        self.cost_to_go[-1] = np.zeros(len(self.layers[-1]))
+        self.sidetrack = [None] * n
+        indices = [problem.layer_indices(positions) for positions in self.positions]
+        for i in range(n - 2, -1, -1):
+            step = problem.index_cost_matrix(indices[i], indices[i + 1])
+            through = step + self.cost_to_go[i + 1][None, :]
+            self.cost_to_go[i] = through.min(axis=1)
+            # delta = how much worse taking edge (j -> l) is than the best continuation
+            self.sidetrack[i] = through - self.cost_to_go[i][:, None]
+
+        through = first_costs + self.cost_to_go[0]
+        self.best_total = float(through.min())
+        self.start_delta = through - self.best_total
+
+        # Optimal continuation tree; it follows the A* path where that is optimal
+        self.successor = [np.argmin(d, axis=1) for d in self.sidetrack[:-1]]
+        primary = viterbi_search(problem)
+        states = [node.state for node in primary[1:]]
+        indices = [self.layers[i].index(state) for i, state in enumerate(states)]
+        self.start_successor = indices[0]
+        for i in range(n - 1):
+            self.successor[i][indices[i]] = indices[i + 1]
+
+        self._out_lists = {}
+        self._tree_heaps = {}
+
+    def __iter__(self):
+        """Yields (path, total_cost) tuples, cheapest first."""
+        if not self.layers:
+            return
+
+        yield self._build_path(()), self.best_total
+
+        queue = []
+        counter = 0
+        root = self._tree_heap(-1, 0)
+        if root is not None:
+            queue.append((self.best_total + root.key, counter, ("heap", root), None))
+
+        while queue:
+            total, _, item, prefix = heapq.heappop(queue)
+            kind, value = item
+            i, j, r = value.elem if kind == "heap" else value
+            delta = self._delta(i, j, r)
+
+            sidetracks = []
+            link = (i, j, r), prefix
+            while link is not None:
+                sidetracks.append(link[0])
+                link = link[1]
+            yield self._build_path(sidetracks[::-1]), total
+
+            # Replace this sidetrack by the next candidates in the heaps
+            children = []
+            if kind == "heap":
+                children += [("heap", c) for c in (value.left, value.right) if c is not None]
+            if r + 1 < len(self._out_list(i, j)):
+                children.append(("out", (i, j, r + 1)))
+            for child in children:
+                ci, cj, cr = child[1].elem if child[0] == "heap" else child[1]
+                counter += 1
+                heapq.heappush(queue, (total - delta + self._delta(ci, cj, cr),
+                                       counter, child, prefix))
+
+            # Or keep it and add one more sidetrack further along the riff
+            head = self._out_list(i, j)[r]
+            cross = self._tree_heap(i + 1, head)
+            if cross is not None:
+                counter += 1
+                heapq.heappush(queue, (total + cross.key, counter, ("heap", cross),
+                                       ((i, j, r), prefix)))
+
+    def _out_list(self, i, j):
+        """Sidetrack targets leaving candidate j of layer i, cheapest first."""
+        key = (i, j)
+        if key not in self._out_lists:
+            if i == -1:
+                deltas, tree_edge = self.start_delta, self.start_successor
+            elif i < len(self.layers) - 1:
+                deltas, tree_edge = self.sidetrack[i][j], self.successor[i][j]
+            else:
+                self._out_lists[key] = []
+                return []
+            order = np.argsort(deltas, kind="stable")
+            self._out_lists[key] = [int(l) for l in order if l != tree_edge]
+        return self._out_lists[key]
+
+    def _delta(self, i, j, r):
+        head = self._out_list(i, j)[r]
+        if i == -1:
+            return float(self.start_delta[head])
+        return float(self.sidetrack[i][j][head])
+
+    def _tree_heap(self, i, j):
+        """
+        Persistent heap of the best sidetrack of every candidate on the
+        optimal continuation from (i, j). Built lazily and shared.
+        """
+        chain = []
+        while (i, j) not in self._tree_heaps and i < len(self.layers) - 1:
+            chain.append((i, j))
+            j = self.start_successor if i == -1 else int(self.successor[i][j])
+            i += 1
+
+        heap = self._tree_heaps.get((i, j))
+        for ci, cj in reversed(chain):
+            if self._out_list(ci, cj):
+                heap = _merge(heap, _HeapNode(self._delta(ci, cj, 0), (ci, cj, 0)))
+            self._tree_heaps[(ci, cj)] = heap
+        return heap
+
+    def _build_path(self, sidetracks):
+        """Follows the optimal tree, taking the given sidetracks in order."""
+        path = []
+        pending = iter(sidetracks)
+        nxt = next(pending, None)
+        i, j = -1, 0
+        while i < len(self.layers) - 1:
+            if nxt is not None and nxt[0] == i and nxt[1] == j:
+                j = self._out_list(i, j)[nxt[2]]
+                nxt = next(pending, None)
+            elif i == -1:
+                j = self.start_successor
+            else:
+                j = int(self.successor[i][j])
+            i += 1
+            s, f = self.positions[i][j]
+            path.append((int(s), int(f)))
+        return path
@@ -28,6 +28,8 @@ class Node:
     """A node in a search tree. Contains a pointer to the parent (the node
     that this is a successor of) and to the actual state for this node."""
 
+    __slots__ = ("state", "parent", "action", "path_cost", "depth")
+
     def __init__(self, state, parent=None, action=None, path_cost=0):
         self.state = state
         self.parent = parent
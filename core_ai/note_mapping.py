@@ -1,51 +1,93 @@
-from music21 import note
+import re
+import sys
+from functools import lru_cache
+
+from core_ai.instruments import get_instrument, build_position_index
+
+# Semitone offset of each natural note inside an octave
+STEP_SEMITONES = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+ACCIDENTAL_SEMITONES = {"": 0, "#": 1, "##": 2, "-": -1, "--": -2, "b": -1}
+# Same spelling music21 uses for MIDI -> name (flats written as '-')
+PITCH_CLASS_NAMES = ["C", "C#", "D", "E-", "E", "F", "F#", "G", "G#", "A", "B-", "B"]
+
+# Scientific pitch notation: letter, optional accidental, optional octave
+PITCH_PATTERN = re.compile(r"([A-Ga-g])(##|--|#|-|b)?([0-8])?")
+
+
+# Bounded: long-running services parse note names straight from clients
+@lru_cache(maxsize=4096)
+def note_name_to_midi(note_name):
+    """
+    Converts a note name (e.g., 'C4', 'G#3', 'Bb2') into a MIDI number.
+    Common spellings are parsed directly; music21 is only used as a
+    fallback for exotic ones. Results are memoized.
+    """
+    match = PITCH_PATTERN.fullmatch(note_name)
+    if match:
+        step, accidental, octave = match.groups()
+        octave = int(octave) if octave is not None else 4  # music21 default
+        return ((octave + 1) * 12 + STEP_SEMITONES[step.upper()] +
+                ACCIDENTAL_SEMITONES[accidental or ""])
+
+    try:
+        from music21 import note  # Slow import, only needed for exotic spellings
+
+        n = note.Note(note_name)
+        return n.pitch.midi
+    except Exception as e:
+        print(f"Error converting note name: {e}", file=sys.stderr)
+        return None
+
 
 class NoteMapper:
     """
     Handles the translation between musical notation (Pitch)
     and the physical coordinates of the guitar fretboard.
     """
-    def __init__(self, num_frets=22):
-        # Standard Guitar Tuning (E2, A2, D3, G3, B3, E4) in MIDI values
-        self.tuning = {
-            1: 64, # High E String (E4)
-            2: 59, # B String (B3)
-            3: 55, # G String (G3)
-            4: 50, # D String (D3)
-            5: 45, # A String (A2)
-            6: 40  # Low E String (E2)
-        }
-        self.num_frets = num_frets # Standard fret count
+    def __init__(self, num_frets=None, instrument="standard"):
+        # Tuning and fret count come from the instrument registry (default:
+        # standard E2 A2 D3 G3 B3 E4, 22 frets); num_frets overrides the
+        # instrument's fret count
+        self.instrument = get_instrument(instrument, num_frets)
+        self.tuning = dict(self.instrument.tuning)
+        self.num_frets = self.instrument.num_frets
+        # Shared with every mapper of the same instrument
+        self.position_index = self.instrument.position_index()
+
+    @property
+    def num_strings(self):
+        return len(self.tuning)
+
+    def build_position_index(self):
+        """
+        Precomputes the (string, fret) positions of every playable MIDI value.
+        Only needed after changing tuning or num_frets by hand; registered
+        instruments come with a shared, prebuilt index.
+        """
+        self.position_index = build_position_index(self.tuning, self.num_frets)
 
     def note_to_midi(self, note_name):
         """
         Converts a note name (e.g., 'C4', 'G#3') into a MIDI number.
         """
-        try:
-            n = note.Note(note_name)
-            return n.pitch.midi
-        except Exception as e:
-            print(f"Error converting note name: {e}")
-            return None
+        return note_name_to_midi(note_name)
 
     def find_positions_on_fretboard(self, midi_value):
         """
         Maps a single MIDI value to all possible (string, fret)
-        locations available on the fretboard.
+        locations available on the fretboard (precomputed tuple).
         """
-        positions = []
-        for string_num, open_note_midi in self.tuning.items():
-            fret = midi_value - open_note_midi
-            # Ensure the note is physically playable on this specific string
-            if 0 <= fret <= self.num_frets:
-                positions.append((string_num, fret))
-        return positions
+        return self.position_index.get(midi_value, ())
 
     def midi_to_note_name(self, midi):
+        if midi >= 12:
+            return f"{PITCH_CLASS_NAMES[midi % 12]}{midi // 12 - 1}"
+        from music21 import note
+
         return note.Note(midi).nameWithOctave
 # Example Usage:
 # mapper = NoteMapper()
 # midi_val = mapper.note_to_midi("A3")
 # possible_locations = mapper.find_positions_on_fretboard(midi_val)
 # print(f"Locations for A3: {possible_locations}")
-# Output might be: [(2, -2), (3, 2), (4, 7), (5, 12), (6, 17)] -> (2, -2) is filtered out.
\ No newline at end of file
+# Output might be: [(2, -2), (3, 2), (4, 7), (5, 12), (6, 17)] -> (2, -2) is filtered out.
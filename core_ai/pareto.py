@@ -0,0 +1,103 @@
+import numpy as np
+
+from core_ai.search_viterbi import candidate_layers
+
+# Objectives minimized by pareto_front, in label column order
+OBJECTIVES = ("stretch", "string", "penalty_count")
+
+
+def pareto_mask(points):
+    """
+    Indices of the non-dominated rows of an (N, 3) integer array, in
+    lexicographic order. Of several identical rows only the first is kept.
+
+    After a lexicographic sort a row can only be dominated by an earlier
+    one, so per value of the last column a running minimum of the middle
+    column over earlier rows decides it.
+    """
+    points = np.asarray(points, dtype=np.int64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.lexsort((points[:, 2], points[:, 1], points[:, 0]))
+    ordered = points[order]
+    keep = np.ones(len(order), dtype=bool)
+    big = np.iinfo(np.int64).max
+
+    for level in np.unique(ordered[:, 2]):
+        middle = np.where(ordered[:, 2] <= level, ordered[:, 1], big)
+        best_before = np.concatenate(([big], np.minimum.accumulate(middle)[:-1]))
+        keep &= ~((ordered[:, 2] == level) & (best_before <= ordered[:, 1]))
+
+    return order[keep]
+
+
+def pareto_front(problem, stats=None, progress=None):
+    """
+    Every Pareto-optimal fingering of a single-note riff over (fret
+    stretch, string shift, anatomical penalty count), as a list of
+    (string, fret) paths.
+
+    Label-setting over the note layers: a label is one partial fingering's
+    objective totals ending at one candidate position, and each (layer,
+    position) keeps only its non-dominated labels, so the work grows with
+    the front size rather than with the number of weightings explored.
+    Totals are counted in frets and strings and scaled by the weights
+    afterwards (calculate_final_metrics). One path is kept per distinct
+    objective vector. If a stats dict is given, it receives
+    layers_processed, labels (kept over all layers) and max_labels (most
+    labels at one position). A Progress is updated once per layer.
+    """
+    layers = candidate_layers(problem)
+    if not layers:
+        return []
+
+    max_stretch = problem.cost_calculator.MAX_REACHABLE_STRETCH
+    positions = np.array([(s, f) for s, f, _ in layers[0]], dtype=np.int64)
+
+    # Labels of the current layer: candidate index and objective totals
+    at = np.arange(len(positions))
+    totals = np.zeros((len(positions), 3), dtype=np.int64)
+    # Per later layer: (candidate index, parent label) of every label
+    history = [(at, np.full(len(at), -1))]
+    label_count, max_labels = len(at), 1
+
+    for i, layer in enumerate(layers[1:], 2):
+        if progress is not None:
+            progress.update(i, len(layers), "layers")
+        nxt = np.array([(s, f) for s, f, _ in layer], dtype=np.int64)
+
+        fret_diff = np.abs(positions[at, 1][:, None] - nxt[None, :, 1])
+        string_diff = np.abs(positions[at, 0][:, None] - nxt[None, :, 0])
+        steps = np.stack([fret_diff, string_diff, fret_diff > max_stretch], axis=2)
+
+        new_at, new_parent, new_totals = [], [], []
+        for j in range(len(nxt)):
+            candidates = totals + steps[:, j]
+            kept = pareto_mask(candidates)
+            new_at.append(np.full(len(kept), j))
+            new_parent.append(kept)
+            new_totals.append(candidates[kept])
+            max_labels = max(max_labels, len(kept))
+
+        at = np.concatenate(new_at)
+        totals = np.concatenate(new_totals)
+        history.append((at, np.concatenate(new_parent)))
+        label_count += len(at)
+        positions = nxt
+
+    if stats is not None:
+        stats["layers_processed"] = len(layers)
+        stats["labels"] = label_count
+        stats["max_labels"] = max_labels
+
+    # Walk every front member back at once, one layer per step
+    labels = pareto_mask(totals)
+    columns = []
+    for candidates, parents in reversed(history):
+        columns.append(candidates[labels])
+        labels = parents[labels]
+    columns.reverse()
+
+    return [[layer[j][:2] for layer, j in zip(layers, row)]
+            for row in np.array(columns).T.tolist()]
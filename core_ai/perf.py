@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+from core_ai.note_mapping import note_name_to_midi
+
+
+class PerfRecorder:
+    """
+    Collects phase timings and counters for one solve. The result is
+    reported under the "perf" key of the analysis dict.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self._parse_cache = note_name_to_midi.cache_info()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def add_counters(self, counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def as_dict(self):
+        """Timings in milliseconds plus counters, parse-cache counters included."""
+        info = note_name_to_midi.cache_info()
+        hits = info.hits - self._parse_cache.hits
+        misses = info.misses - self._parse_cache.misses
+
+        perf = {f"{name}_ms": round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+        perf["total_ms"] = round(sum(self.timings.values()) * 1000, 3)
+        perf.update(self.counters)
+        perf["parse_calls"] = hits + misses
+        perf["parse_cache_hits"] = hits
+        return perf
+
+
+class NullRecorder:
+    """Stand-in used when instrumentation is off; every call is a no-op."""
+
+    def phase(self, name):
+        return nullcontext()
+
+    def add_counters(self, counters):
+        pass
+
+
+NULL_RECORDER = NullRecorder()
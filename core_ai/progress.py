@@ -0,0 +1,37 @@
+import threading
+
+
+class SolveCancelled(Exception):
+    """Raised inside a solve whose Progress was cancelled."""
+
+
+class Progress:
+    """
+    Live progress of one solve, shared with the thread that started it.
+
+    The solver calls update() as it goes (layers or nodes done so far);
+    any thread may read done/total/unit or call cancel(), after which the
+    next update() raises SolveCancelled inside the solver.
+    """
+
+    def __init__(self):
+        self.done = 0
+        self.total = 0  # 0 when unknown (A*)
+        self.unit = "layers"
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def update(self, done, total=None, unit=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if unit is not None:
+            self.unit = unit
+        if self._cancelled.is_set():
+            raise SolveCancelled()
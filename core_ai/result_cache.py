@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from core_ai.chords import is_chord
+
+# Bump when solver output changes, so stale disk entries are never served
+CACHE_VERSION = 1
+
+
+def cache_key(riff, mapper, evaluator, engine="astar", heuristic="uniform"):
+    """
+    Digest identifying one solve: the riff normalized to MIDI values
+    (enharmonic spellings and chord note order do not matter), the tuning,
+    fret count, every ErgonomicCost weight, the engine and the heuristic.
+    """
+    def midi(note_name):
+        value = mapper.note_to_midi(note_name)
+        return note_name if value is None else value
+
+    notes = [sorted(map(midi, event), key=str) if is_chord(event) else midi(event)
+             for event in riff]
+    material = {
+        "version": CACHE_VERSION,
+        "riff": notes,
+        "tuning": sorted(mapper.tuning.items()),
+        "frets": mapper.num_frets,
+        "strings": evaluator.num_strings,
+        "cost_frets": evaluator.num_frets,
+        "weights": [getattr(evaluator, name) for name in evaluator.WEIGHT_ATTRIBUTES],
+        "engine": engine,
+        "heuristic": heuristic,
+    }
+    return hashlib.blake2b(json.dumps(material).encode(), digest_size=16).hexdigest()
+
+
+def _encode(path, analysis):
+    return json.dumps([path, analysis])
+
+
+def _decode(text):
+    path, analysis = json.loads(text)
+    return [tuple(tuple(p) for p in entry) if isinstance(entry[0], list) else tuple(entry)
+            for entry in path], analysis
+
+
+class ResultCache:
+    """
+    Two-tier cache of (path, analysis) results: an in-process LRU in front
+    of an optional SQLite file shared by processes and restarts.
+
+    The database runs in WAL mode with a busy timeout, so several worker
+    processes can read and write it at once; each process (and fork) opens
+    its own connection. When the stored results exceed max_disk_bytes the
+    least recently used rows are evicted.
+    """
+
+    EVICT_EVERY = 64  # puts between disk size checks
+
+    def __init__(self, path=None, memory_size=1024, max_disk_bytes=64 * 2 ** 20):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._puts = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self):
+        if self.path is None:
+            return None
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS results ("
+                               "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                               "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS results_last_used "
+                               "ON results (last_used)")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key):
+        """Returns a fresh (path, analysis) copy, or None on a miss."""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return _decode(text)
+
+            db = self._db()
+            row = None
+            if db is not None:
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return _decode(row[0])
+
+    def put(self, key, path, analysis):
+        text = _encode(path, analysis)
+        with self._lock:
+            self._remember(key, text)
+            db = self._db()
+            if db is None:
+                return
+            db.execute("INSERT OR REPLACE INTO results (key, value, size, last_used) "
+                       "VALUES (?, ?, ?, ?)", (key, text, len(text), time.time()))
+            self._puts += 1
+            if self._puts % self.EVICT_EVERY == 0:
+                self._evict(db)
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self, db):
+        """Drops least recently used rows until the store is 90% of its limit."""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        target = int(self.max_disk_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM results")
+
+    def stats(self):
+        """Hit/miss counters of this process plus the current tier sizes."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+            db = self._db()
+            if db is not None:
+                count, size = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+            return stats
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from core_ai.note_mapping import NoteMapper, STEP_SEMITONES, ACCIDENTAL_SEMITONES
+
+EXCEL_PATH = "guitar_midi_notes.xlsx"
+
+SCALES = {
+    "major": (0, 2, 4, 5, 7, 9, 11),
+    "minor": (0, 2, 3, 5, 7, 8, 10),
+    "chromatic": tuple(range(12)),
+}
+
+# Validated pools per (path, mtime, tuning, frets)
+_pools = {}
+
+
+def sidecar_path(path):
+    return path + ".pool.json"
+
+
+def read_excel_notes(path):
+    """The note names listed in column B (rows 2-48) of the workbook."""
+    import pandas as pd
+
+    df = pd.read_excel(path, usecols=[1], skiprows=1, nrows=47, header=None, engine="openpyxl")
+    return [str(n) for n in df.iloc[:, 0].dropna().tolist()]
+
+
+def _read_sidecar(path, mtime):
+    try:
+        with open(sidecar_path(path), encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("source_mtime_ns") != mtime:
+        return None
+    return cached.get("notes")
+
+
+def _write_sidecar(path, mtime, notes):
+    target = sidecar_path(path)
+    temp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"source_mtime_ns": mtime, "notes": notes}, f)
+        os.replace(temp, target)
+    except OSError as e:
+        print(f"Note pool cache not written: {e}", file=sys.stderr)
+
+
+def load_note_pool(path=EXCEL_PATH, mapper=None):
+    """
+    The workbook's note names that parse and are playable on the mapper's
+    fretboard, as a tuple. The raw column is cached in a JSON sidecar next
+    to the workbook (rebuilt when the workbook's mtime changes) and the
+    validated pool in memory, so the workbook is read once.
+    Raises OSError if the workbook is missing.
+    """
+    mapper = mapper or NoteMapper()
+    mtime = os.stat(path).st_mtime_ns
+    key = (os.path.abspath(path), mtime, tuple(sorted(mapper.tuning.items())), mapper.num_frets)
+
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    notes = _read_sidecar(path, mtime)
+    if notes is None:
+        notes = read_excel_notes(path)
+        _write_sidecar(path, mtime, notes)
+
+    valid = []
+    for note_name in notes:
+        midi_val = mapper.note_to_midi(note_name)
+        if midi_val is None or not mapper.find_positions_on_fretboard(midi_val):
+            print(f"Skipping unplayable note in {path}: {note_name}", file=sys.stderr)
+            continue
+        valid.append(note_name)
+
+    pool = tuple(valid)
+    _pools[key] = pool
+    return pool
+
+
+def key_pitch_classes(key):
+    """
+    Pitch classes of a key such as 'C', 'A minor' or 'F# major'
+    (default scale: major).
+    """
+    tonic, _, scale = key.strip().partition(" ")
+    scale = scale.strip().lower() or "major"
+    if scale not in SCALES or not tonic or tonic[0].upper() not in STEP_SEMITONES:
+        raise ValueError(f"Unknown key: {key}")
+    accidental = tonic[1:]
+    if accidental not in ACCIDENTAL_SEMITONES:
+        raise ValueError(f"Unknown key: {key}")
+    root = STEP_SEMITONES[tonic[0].upper()] + ACCIDENTAL_SEMITONES[accidental]
+    return {(root + step) % 12 for step in SCALES[scale]}
+
+
+def allowed_midi(mapper=None, key=None, low=None, high=None, pool=None):
+    """
+    Sorted MIDI values a generated riff may use: playable on the mapper,
+    inside [low, high] (MIDI values or note names), in the key and in the
+    pool of note names when given.
+    """
+    mapper = mapper or NoteMapper()
+    values = set(mapper.position_index)
+
+    if low is not None:
+        low = mapper.note_to_midi(low) if isinstance(low, str) else low
+        values = {m for m in values if m >= low}
+    if high is not None:
+        high = mapper.note_to_midi(high) if isinstance(high, str) else high
+        values = {m for m in values if m <= high}
+    if key is not None:
+        classes = key_pitch_classes(key)
+        values = {m for m in values if m % 12 in classes}
+    if pool is not None:
+        values &= {mapper.note_to_midi(n) for n in pool}
+
+    if not values:
+        raise ValueError("No playable notes satisfy the constraints")
+    return np.array(sorted(values), dtype=np.int64)
+
+
+def random_midi(count, length, seed=None, **constraints):
+    """
+    A (count, length) array of random MIDI values drawn uniformly from
+    allowed_midi(**constraints). Vectorized; reproducible with a seed.
+    """
+    values = allowed_midi(**constraints)
+    rng = np.random.default_rng(seed)
+    return values[rng.integers(0, len(values), size=(count, length))]
+
+
+def random_riffs(count, length, seed=None, mapper=None, **constraints):
+    """Like random_midi, as a list of riffs (lists of note names)."""
+    mapper = mapper or NoteMapper()
+    midi = random_midi(count, length, seed, mapper=mapper, **constraints)
+    low, high = int(midi.min(initial=127)), int(midi.max(initial=0))
+    names = np.array([None] * (high + 1), dtype=object)
+    for m in range(low, high + 1):
+        names[m] = mapper.midi_to_note_name(m)
+    return names[midi].tolist()
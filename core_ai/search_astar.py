@@ -1,5 +1,5 @@
 import heapq
-import itertools
+import numpy as np
 from core_ai.models import Problem, Node
 from core_ai.note_mapping import NoteMapper
 from core_ai.cost import ErgonomicCost
@@ -11,10 +11,24 @@ class GuitarPathProblem(Problem):
     State format: (string, fret, note_index)
     """
 
-    def __init__(self, riff_notes):
-        self.mapper = NoteMapper()
-        self.cost_calculator = ErgonomicCost()
+    HEURISTICS = ("uniform", "layer_min", "backward")
+
+    def __init__(self, riff_notes, mapper=None, cost_calculator=None, heuristic="uniform"):
+        if heuristic not in self.HEURISTICS:
+            raise ValueError(f"Unknown heuristic: {heuristic}")
+
+        # Pre-built mapper / cost model can be shared across many problems
+        self.mapper = mapper or NoteMapper()
+        # A supplied cost model is resized (same weights) if it does not
+        # cover every position the mapper can return
+        if cost_calculator is None:
+            cost_calculator = ErgonomicCost(self.mapper.num_strings, self.mapper.num_frets)
+        self.cost_calculator = cost_calculator.sized_for(self.mapper.num_strings,
+                                                         self.mapper.num_frets)
         self.riff_notes = riff_notes
+        self.heuristic = heuristic
+        self._cost_to_go = None
+        self._path_table = None
 
         # Dummy initial state (before first note)
         initial_state = (0, 0, -1)
@@ -47,55 +61,186 @@ class GuitarPathProblem(Problem):
         if state1[2] == -1:
             return c + 1.0
 
-        pos1 = (state1[0], state1[1])
-        pos2 = (state2[0], state2[1])
+        calc = self.cost_calculator
+        table = calc.transition_table()
+        i1 = (state1[0] - 1) * (calc.num_frets + 1) + state1[1]
+        i2 = (state2[0] - 1) * (calc.num_frets + 1) + state2[1]
 
-        step_cost = self.cost_calculator.calculate_step_cost(pos1, pos2)
+        # Precomputed calculate_step_cost
+        step_cost = float(table["cost"][i1, i2])
 
         # Soft anatomical constraint
-        if not self.cost_calculator.is_physically_possible(pos1, pos2):
+        if table["penalty"][i1, i2]:
             step_cost += 15.0
 
         return c + step_cost
 
-    def h(self, node):
+    def path_cost_table(self):
+        """
+        path_cost between every pair of board positions (first note
+        excepted), indexed by layer_indices. Built once per cost table.
+        """
+        table = self.cost_calculator.transition_table()
+        if self._path_table is None or self._path_table[0] is not table:
+            # Soft anatomical constraint, on top of the one in the table
+            cost = np.where(table["penalty"], table["cost"] + 15.0, table["cost"])
+            self._path_table = (table, cost)
+        return self._path_table[1]
+
+    def layer_indices(self, positions):
+        """
+        Table indices of a layer of candidate (string, fret) positions.
+        Candidates come from the mapper, whose board the cost model covers,
+        so they are not bounds-checked again.
+        """
+        return self.cost_calculator.board_indices(np.asarray(positions).reshape(-1, 2))
+
+    def index_cost_matrix(self, prev_indices, next_indices):
+        """step_cost_matrix for two layers already mapped by layer_indices."""
+        return self.path_cost_table()[prev_indices[:, None], next_indices[None, :]]
+
+    def step_cost_matrix(self, prev_positions, next_positions):
+        """
+        Vectorized path_cost: returns a (len(prev), len(next)) matrix with
+        the cost of every transition between two candidate layers.
+        """
+        return self.index_cost_matrix(self.layer_indices(prev_positions),
+                                      self.layer_indices(next_positions))
+
+    def h(self, state):
+        """
+        Admissible heuristic for a state, selected by self.heuristic:
+        - uniform:   remaining notes x minimum step cost (1.0)
+        - layer_min: sum of the cheapest transition between each pair of
+                     remaining layers (relaxed, ignores where we stand)
+        - backward:  exact cost-to-go from a backward DP pass (perfect)
+        """
+        if self.heuristic == "uniform":
+            remaining_notes = len(self.riff_notes) - 1 - state[2]
+            MIN_STEP_COST = 1.0
+            return remaining_notes * MIN_STEP_COST
+
+        if self._cost_to_go is None:
+            self._cost_to_go = self._build_cost_to_go()
+        if self._cost_to_go is False:
+            return 0.0  # Some note is unplayable, the search will fail anyway
+
+        if self.heuristic == "layer_min":
+            return self._cost_to_go[state[2] + 1]
+        if state[2] == -1:
+            return min(self._cost_to_go[0].values()) + 1.0
+        return self._cost_to_go[state[2]][(state[0], state[1])]
+
+    def _build_cost_to_go(self):
         """
-        Admissible heuristic:
-        Minimum possible cost assuming best-case movement.
+        One backward pass over the note layers. Returns a list indexed by
+        note index: per-layer floats for layer_min, {(string, fret): cost}
+        dicts for backward, or False if a note has no position.
         """
-        remaining_notes = len(self.riff_notes) - 1 - node.state[2]
-        MIN_STEP_COST = 1.0
-        return remaining_notes * MIN_STEP_COST
+        layers = []
+        state = self.initial
+        for _ in range(len(self.riff_notes)):
+            actions = self.actions(state)
+            if not actions:
+                return False
+            layers.append(np.array([(s, f) for s, f, _ in actions]))
+            state = actions[0]
+        indices = [self.layer_indices(layer) for layer in layers]
+
+        if self.heuristic == "layer_min":
+            remaining = [0.0] * (len(layers) + 1)
+            for i in range(len(layers) - 2, -1, -1):
+                step = self.index_cost_matrix(indices[i], indices[i + 1])
+                remaining[i + 1] = remaining[i + 2] + float(step.min())
+            remaining[0] = remaining[1] + 1.0  # First note's base cost
+            return remaining
+
+        if not layers:
+            return []
+
+        cost_to_go = [None] * len(layers)
+        h = np.zeros(len(layers[-1]))
+        for i in range(len(layers) - 1, -1, -1):
+            if i < len(layers) - 1:
+                h = np.min(self.index_cost_matrix(indices[i], indices[i + 1]) + h[None, :], axis=1)
+            cost_to_go[i] = {(int(s), int(f)): float(v) for (s, f), v in zip(layers[i], h)}
+        return cost_to_go
 
 
-def astar_search(problem):
+def astar_search(problem, stats=None, progress=None):
     """
     Correct A* implementation with dominance checks.
-    """
 
-    start = Node(problem.initial)
+    Search entries are kept in flat lists (state, action, cost, parent
+    index) instead of Node objects; Node objects are only built for the
+    returned path. If a stats dict is given, it receives nodes_expanded,
+    nodes_generated, max_frontier and best_g_size. A Progress is updated
+    with the expanded node count (and may cancel the search).
+    """
+    states = [problem.initial]
+    actions = [None]
+    costs = [0]
+    parents = [-1]
 
-    counter = itertools.count()
-    frontier = []
-    heapq.heappush(frontier, (problem.h(start), next(counter), start))
+    # Entries are (f, g, entry index): equal f (after float rounding) goes
+    # to the lower g, then FIFO. Layered engines reproduce this order.
+    frontier = [(problem.h(problem.initial), 0, 0)]
 
     # Best known g(n) for each state
-    best_g = {start.state: 0}
+    best_g = {problem.initial: 0}
+
+    expanded = 0
+    max_frontier = 1
+    result = None
 
     while frontier:
-        _, _, node = heapq.heappop(frontier)
+        _, _, entry = heapq.heappop(frontier)
+        state = states[entry]
 
-        if problem.goal_test(node.state):
-            return node.path()
+        if problem.goal_test(state):
+            result = _build_path(states, actions, costs, parents, entry)
+            break
 
-        for child in node.expand(problem):
-            s = child.state
-            g = child.path_cost
+        expanded += 1
+        g_parent = costs[entry]
+        if progress is not None and expanded % 256 == 0:
+            progress.update(expanded, unit="nodes")
+
+        for action in problem.actions(state):
+            s = problem.result(state, action)
+            g = problem.path_cost(g_parent, state, action, s)
 
             # Dominance check (KEY FIX)
             if s not in best_g or g < best_g[s]:
                 best_g[s] = g
-                f = g + problem.h(child)
-                heapq.heappush(frontier, (f, next(counter), child))
-
-    return None
+                states.append(s)
+                actions.append(action)
+                costs.append(g)
+                parents.append(entry)
+                heapq.heappush(frontier, (g + problem.h(s), g, len(states) - 1))
+
+        if len(frontier) > max_frontier:
+            max_frontier = len(frontier)
+
+    if stats is not None:
+        stats["nodes_expanded"] = expanded
+        stats["nodes_generated"] = len(states) - 1
+        stats["max_frontier"] = max_frontier
+        stats["best_g_size"] = len(best_g)
+
+    return result
+
+
+def _build_path(states, actions, costs, parents, entry):
+    """Rebuilds the root-to-goal Node path from parent indices."""
+    chain = []
+    while entry != -1:
+        chain.append(entry)
+        entry = parents[entry]
+
+    path = []
+    node = None
+    for entry in reversed(chain):
+        node = Node(states[entry], node, actions[entry], costs[entry])
+        path.append(node)
+    return path
@@ -0,0 +1,266 @@
+import math
+import numpy as np
+from core_ai.models import Node
+
+
+def candidate_layers(problem):
+    """
+    Returns one list of candidate states (string, fret, note_index) per riff
+    note, or None if some note has no playable position.
+    """
+    layers = []
+    state = problem.initial
+
+    for _ in range(len(problem.riff_notes)):
+        actions = problem.actions(state)
+        if not actions:
+            return None
+        layers.append(actions)
+        state = actions[0]
+
+    return layers
+
+
+def initial_rank(g):
+    """
+    Pop order of the first layer inside the A* frontier: (g, push order).
+    Returns the order and each candidate's position in it.
+    """
+    rank = np.lexsort((np.arange(len(g)), g))
+    rank_of = np.empty_like(rank)
+    rank_of[rank] = np.arange(len(rank))
+    return rank, rank_of
+
+
+def advance_layer(g, rank, rank_of, cost):
+    """
+    One Viterbi step from a layer with costs g to the next one, given the
+    (len(g), m) transition cost matrix. Returns backpointers, new g and the
+    new layer's A* pop order (rank, rank_of).
+    """
+    # Rows in pop order: argmin keeps the first-expanded predecessor
+    ordered = g[rank][:, None] + cost[rank]
+    best_row = np.argmin(ordered, axis=0)
+    columns = np.arange(cost.shape[1])
+    new_g = ordered[best_row, columns]
+
+    # best_row is the parent's rank; lexsort is stable, so columns break
+    # the remaining ties
+    order = np.lexsort((best_row, new_g))
+    new_rank_of = np.empty_like(order)
+    new_rank_of[order] = columns
+
+    return rank[best_row], new_g, order, new_rank_of
+
+
+def padded_layers(problem):
+    """
+    Candidate positions of every riff note as one (n, k, 2) array, k being
+    the widest layer, plus the (n,) candidate counts; or None if some note
+    has no playable position. Candidates keep the order of problem.actions,
+    and shorter layers are padded with their first candidate.
+    """
+    notes = problem.riff_notes
+    if not notes:
+        return None
+
+    mapper = problem.mapper
+    distinct = {}
+    note_ids = np.array([distinct.setdefault(note, len(distinct)) for note in notes])
+    layers = []
+    for note in distinct:
+        midi_val = mapper.note_to_midi(note)
+        positions = mapper.find_positions_on_fretboard(midi_val) if midi_val is not None else []
+        if not positions:
+            return None
+        layers.append(list(positions))
+
+    k = max(len(layer) for layer in layers)
+    table = np.array([layer + layer[:1] * (k - len(layer)) for layer in layers], dtype=np.int64)
+    counts = np.array([len(layer) for layer in layers])
+    return table[note_ids], counts[note_ids]
+
+
+# Layer pairs whose transition costs are gathered at once (bounds the
+# float matrices to BLOCK_LAYERS * k * k per gather)
+BLOCK_LAYERS = 4096
+
+
+def viterbi_search(problem, stats=None, progress=None):
+    """
+    Layered Viterbi-style dynamic programming over the riff notes.
+
+    Each note is a layer of candidate positions, padded to the widest
+    layer; the transition costs of all layer pairs are gathered from the
+    path-cost table in blocks of BLOCK_LAYERS, so the per-note loop only
+    does one argmin and the rank update. Ties are broken in the same order
+    astar_search pops its frontier, (f, g, push order), so for any weights
+    both engines return the same path (astar_search with the uniform
+    heuristic; the others may pick another path of equal cost).
+    Returns the node path (dummy start included) like astar_search.
+    If a stats dict is given, it receives layers_processed and
+    nodes_generated (candidate positions scored). A Progress is updated
+    once per layer (and may cancel the search).
+    """
+    layers = padded_layers(problem)
+    if layers is None:
+        return None
+
+    positions, counts = layers
+    n, k = counts.shape[0], positions.shape[1]
+    indices = problem.layer_indices(positions).reshape(n, k)
+    padding = np.arange(k)[None, :] >= counts[:, None]
+    path_costs = problem.path_cost_table()
+
+    start = problem.initial
+    first_costs = np.array([problem.path_cost(0, start, (s, f, 0), (s, f, 0))
+                            for s, f in positions[0].tolist()])
+    g = np.where(padding[0], np.inf, first_costs)
+    rank, _ = initial_rank(g)
+    columns = np.arange(k)
+
+    backpointers = np.zeros((n, k), dtype=np.uint8)
+
+    for block in range(0, n - 1, BLOCK_LAYERS):
+        stop = min(block + BLOCK_LAYERS, n - 1)
+        cost = path_costs[indices[block:stop, :, None], indices[block + 1:stop + 1, None, :]]
+        # Padding candidates are never entered
+        cost[np.broadcast_to(padding[block + 1:stop + 1, None, :], cost.shape)] = np.inf
+
+        # advance_layer inlined; rank_of is not needed without a caller
+        for i in range(block + 1, stop + 1):
+            if progress is not None:
+                progress.update(i + 1, n, "layers")
+            ordered = cost[i - 1 - block][rank]
+            ordered += g[rank][:, None]
+            best_row = ordered.argmin(axis=0)
+            g = ordered[best_row, columns]
+            backpointers[i] = rank[best_row]
+            rank = np.lexsort((best_row, g))
+
+    if stats is not None:
+        stats["layers_processed"] = n
+        stats["nodes_generated"] = int(counts.sum())
+
+    # Goal: the first goal node popped from the frontier
+    chosen = np.empty(n, dtype=np.int64)
+    j = int(rank[0])
+    for i in range(n - 1, -1, -1):
+        chosen[i] = j
+        j = int(backpointers[i, j])
+
+    # path_cost of every prefix, summed in the same order as path_cost would
+    steps = path_costs[indices[np.arange(n - 1), chosen[:-1]], indices[np.arange(1, n), chosen[1:]]]
+    totals = np.cumsum(np.concatenate(([first_costs[chosen[0]]], steps))).tolist()
+
+    node = Node(start)
+    path = [node]
+    for i, ((s, f), total) in enumerate(zip(positions[np.arange(n), chosen].tolist(), totals)):
+        action = (s, f, i)
+        node = Node(action, node, action, total)
+        path.append(node)
+
+    return path
+
+
+def checkpoint_search(problem, segment_length=None, stats=None, progress=None):
+    """
+    Memory-bounded variant of viterbi_search (√n checkpointing), returning
+    the node path like the other engines. The search itself runs in
+    checkpoint_positions; building the n returned Nodes is O(n) memory on
+    top of it, so callers that only need positions on very long inputs
+    should call checkpoint_positions directly.
+    """
+    positions = checkpoint_positions(problem, segment_length, stats, progress)
+    if positions is None:
+        return None
+
+    node = Node(problem.initial)
+    path = [node]
+    for i, (s, f) in enumerate(positions.tolist()):
+        action = (s, f, i)
+        node = Node(action, node, action,
+                    problem.path_cost(node.path_cost, node.state, action, action))
+        path.append(node)
+
+    return path
+
+
+def checkpoint_positions(problem, segment_length=None, stats=None, progress=None):
+    """
+    The forward pass keeps only every segment_length-th DP column (default
+    √n) and no backpointers. The path is then rebuilt segment by segment
+    from the end, re-running the forward pass inside one segment at a
+    time. Search state is O((n / segment_length + segment_length) · k)
+    instead of O(n · k), for about twice the time; the result is a compact
+    (n, 2) uint8 array of (string, fret) rows, 2 bytes per note, or None
+    if some note is unplayable. Same fingering as viterbi_search; stats
+    and progress as in viterbi_search (progress counts the layers of both
+    passes).
+    """
+    n = len(problem.riff_notes)
+    if n == 0:
+        return None
+    segment_length = segment_length or max(1, math.isqrt(n))
+
+    def layer(i):
+        return problem.actions((0, 0, i - 1))
+
+    def to_array(actions):
+        return np.array([(s, f) for s, f, _ in actions], dtype=np.int64)
+
+    start = problem.initial
+    checkpoints = {}
+    positions = None
+
+    for i in range(n):
+        if progress is not None:
+            progress.update(i + 1, 2 * n - 1, "layers")
+        actions = layer(i)
+        if not actions:
+            return None
+        nxt = to_array(actions)
+        nxt_indices = problem.layer_indices(nxt)
+        if i == 0:
+            g = np.array([problem.path_cost(0, start, a, a) for a in actions])
+            rank, rank_of = initial_rank(g)
+        else:
+            cost = problem.index_cost_matrix(indices, nxt_indices)
+            _, g, rank, rank_of = advance_layer(g, rank, rank_of, cost)
+        if i % segment_length == 0:
+            checkpoints[i] = (g, rank, rank_of)
+        positions, indices = nxt, nxt_indices
+
+    if stats is not None:
+        stats["layers_processed"] = n
+        stats["checkpoints"] = len(checkpoints)
+
+    # Goal: the first goal node popped from the frontier
+    result = np.zeros((n, 2), dtype=np.uint8)
+    j = int(rank[0])
+    result[n - 1] = positions[j]
+
+    for seg_start in reversed(range(0, n - 1, segment_length)):
+        seg_stop = min(seg_start + segment_length, n - 1)
+        g, rank, rank_of = checkpoints.pop(seg_start)
+        segment = [to_array(layer(seg_start))]
+        indices = problem.layer_indices(segment[0])
+
+        backpointers = []
+        for i in range(seg_start + 1, seg_stop + 1):
+            if progress is not None:
+                progress.update(progress.done + 1)
+            nxt = to_array(layer(i))
+            nxt_indices = problem.layer_indices(nxt)
+            cost = problem.index_cost_matrix(indices, nxt_indices)
+            bp, g, rank, rank_of = advance_layer(g, rank, rank_of, cost)
+            backpointers.append(bp.astype(np.uint8))
+            segment.append(nxt)
+            indices = nxt_indices
+
+        # j is the chosen candidate of seg_stop, carried between segments
+        for i in range(seg_stop, seg_start, -1):
+            j = int(backpointers[i - seg_start - 1][j])
+            result[i - 1] = segment[i - 1 - seg_start][j]
+
+    return result
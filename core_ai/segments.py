@@ -0,0 +1,252 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from core_ai.cost import ErgonomicCost
+from core_ai.instruments import Instrument
+from core_ai.models import Node
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import initial_rank, advance_layer, viterbi_search
+
+# Shorter riffs are solved with viterbi_search: starting work on a pool
+# costs more than the whole serial solve
+MIN_PARALLEL_NOTES = 2048
+
+# Models rebuilt in worker processes, keyed by model_key
+_models = {}
+MAX_MODELS = 8
+
+# Pool reused by every call that does not bring its own executor
+_executor = None
+_executor_workers = None
+
+
+def model_key(mapper, evaluator):
+    """Small picklable description of a mapper / cost model pair."""
+    instrument = mapper.instrument
+    return (instrument.name, tuple(sorted(instrument.tuning.items())), instrument.num_frets,
+            evaluator.num_strings, evaluator.num_frets,
+            tuple(getattr(evaluator, name) for name in evaluator.WEIGHT_ATTRIBUTES))
+
+
+def _models_for(key):
+    """(mapper, evaluator) for a model_key, built once per process."""
+    models = _models.get(key)
+    if models is None:
+        name, tuning, num_frets, num_strings, eval_frets, weights = key
+        mapper = NoteMapper(instrument=Instrument(name, dict(tuning), num_frets))
+        evaluator = ErgonomicCost(num_strings, eval_frets)
+        for attribute, value in zip(ErgonomicCost.WEIGHT_ATTRIBUTES, weights):
+            setattr(evaluator, attribute, value)
+        evaluator.transition_table()
+        if len(_models) >= MAX_MODELS:
+            _models.clear()
+        models = _models[key] = (mapper, evaluator)
+    return models
+
+
+def shared_executor(workers):
+    """The module's process pool, (re)started with the given worker count."""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+@atexit.register
+def _shutdown_executor():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def find_split_points(candidate_counts, max_segment):
+    """
+    Chooses note indices to split the riff at. Notes with exactly one
+    position are natural anchors; gaps longer than max_segment are split
+    again at the note with the fewest positions in their middle half.
+    The first and last note are never split points.
+    """
+    n = len(candidate_counts)
+    splits = [i for i in range(1, n - 1) if candidate_counts[i] == 1]
+
+    bounds = [0] + splits + [n - 1]
+    result = []
+    stack = [(bounds[t], bounds[t + 1]) for t in range(len(bounds) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo <= max_segment:
+            continue
+        quarter = (hi - lo) // 4
+        middle = range(lo + quarter + 1, hi - quarter)
+        split = min(middle, key=lambda i: (candidate_counts[i], abs(2 * i - lo - hi)))
+        result.append(split)
+        stack += [(lo, split), (split, hi)]
+
+    return sorted(set(splits + result))
+
+
+def solve_segment(key, notes, fixed_start):
+    """
+    Runs the layered Viterbi over one segment. With fixed_start False the
+    first note is entered from the dummy start state (head segment);
+    otherwise the run is repeated once per candidate of the first note,
+    each time starting at that candidate with cost 0.
+
+    Returns one (end_costs, backpointers, best_end) tuple per start.
+    """
+    mapper, evaluator = _models_for(key)
+    problem = GuitarPathProblem(notes, mapper, evaluator)
+    layers = [np.array(mapper.find_positions_on_fretboard(mapper.note_to_midi(n)),
+                       dtype=np.int64) for n in notes]
+    indices = [problem.layer_indices(layer) for layer in layers]
+    costs = [problem.index_cost_matrix(indices[i], indices[i + 1])
+             for i in range(len(layers) - 1)]
+
+    if fixed_start:
+        starts = [(np.zeros(1), [a]) for a in range(len(layers[0]))]
+    else:
+        start = problem.initial
+        g0 = np.array([problem.path_cost(0, start, (s, f, 0), (s, f, 0))
+                       for s, f in layers[0].tolist()])
+        starts = [(g0, list(range(len(layers[0]))))]
+
+    results = []
+    for g, rows in starts:
+        rank, rank_of = initial_rank(g)
+        backpointers = []
+        for i, cost in enumerate(costs):
+            bp, g, rank, rank_of = advance_layer(g, rank, rank_of, cost[rows] if i == 0 else cost)
+            if i == 0:
+                bp = np.asarray(rows)[bp]
+            backpointers.append(bp.astype(np.uint8))
+        results.append((g, backpointers, int(rank[0])))
+    return results
+
+
+def _solve_task(task):
+    return solve_segment(*task)
+
+
+def parallel_segment_search(problem, workers=None, max_segment=None, stats=None,
+                            progress=None, executor=None):
+    """
+    Splits the riff at forced-position notes (and, for long gaps, at
+    low-branching notes whose every candidate is tried), solves the
+    segments concurrently on a process pool and stitches them with a
+    small min-plus DP over the split notes. The total cost equals the
+    full solve; when only natural anchors are used the path is identical
+    too, otherwise ties may resolve differently.
+    Returns the node path like the other engines.
+
+    Riffs shorter than MIN_PARALLEL_NOTES, riffs without split points and
+    calls made inside a worker process (e.g. under run_fingering_batch)
+    are solved serially with viterbi_search. Segments go to executor if
+    given, otherwise to a pool kept by this module across calls;
+    workers=0 solves the segments one after another in-process.
+    If a stats dict is given, it receives segments and split_points. A
+    Progress is updated as segments complete; cancelling it stops waiting
+    for the rest.
+    """
+    notes = problem.riff_notes
+    mapper = problem.mapper
+    n = len(notes)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    in_worker = multiprocessing.parent_process() is not None
+    if executor is None and workers != 0 and (n < MIN_PARALLEL_NOTES or in_worker or
+                                              workers == 1):
+        if stats is not None:
+            stats["segments"] = 1
+            stats["split_points"] = 0
+        return viterbi_search(problem, stats, progress)
+
+    counts = []
+    for note_name in notes:
+        midi_val = mapper.note_to_midi(note_name)
+        count = len(mapper.find_positions_on_fretboard(midi_val)) if midi_val is not None else 0
+        if count == 0:
+            return None
+        counts.append(count)
+
+    if max_segment is None:
+        max_segment = max(64, n // max(1, 2 * workers))
+
+    splits = find_split_points(counts, max_segment)
+    if stats is not None:
+        stats["segments"] = len(splits) + 1
+        stats["split_points"] = len(splits)
+    if not splits:
+        return viterbi_search(problem, stats, progress)
+
+    key = model_key(mapper, problem.cost_calculator)
+    bounds = [0] + splits + [n - 1]
+    tasks = [(key, notes[bounds[t]:bounds[t + 1] + 1], t > 0) for t in range(len(bounds) - 1)]
+
+    results = []
+    if workers == 0 and executor is None:
+        _models[key] = (mapper, problem.cost_calculator)
+        for task in tasks:
+            results.append(_solve_task(task))
+            if progress is not None:
+                progress.update(len(results), len(tasks), "segments")
+    else:
+        executor = executor or shared_executor(workers)
+        futures = [executor.submit(_solve_task, task) for task in tasks]
+        try:
+            for future in futures:
+                results.append(future.result())
+                if progress is not None:
+                    progress.update(len(results), len(tasks), "segments")
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    # Min-plus DP over the split notes: best cost to each candidate of each split
+    g, _, _ = results[0][0]
+    choices = []
+    for segment in results[1:-1]:
+        totals = np.array([g[a] + end_costs for a, (end_costs, _, _) in enumerate(segment)])
+        choice = np.argmin(totals, axis=0)
+        choices.append(choice)
+        g = totals[choice, np.arange(totals.shape[1])]
+
+    tail = results[-1]
+    totals = np.array([g[a] + end_costs[best] for a, (end_costs, _, best) in enumerate(tail)])
+    a = int(np.argmin(totals))
+
+    # Walk the segments backwards, tracing each one from its chosen end
+    indices = []
+    end = tail[a][2]
+    for t in range(len(results) - 1, -1, -1):
+        start_choice = 0 if t == 0 else a
+        _, backpointers, _ = results[t][start_choice]
+        segment = [end]
+        j = end
+        for bp in reversed(backpointers):
+            j = int(bp[j])
+            segment.append(j)
+        segment.reverse()
+        indices = segment[1:] + indices if t > 0 else segment + indices
+        if t > 0:
+            end = a
+            if t > 1:
+                a = int(choices[t - 2][a])
+
+    node = Node(problem.initial)
+    path = [node]
+    for i, idx in enumerate(indices):
+        s, f = mapper.find_positions_on_fretboard(mapper.note_to_midi(notes[i]))[idx]
+        action = (s, f, i)
+        node = Node(action, node, action,
+                    problem.path_cost(node.path_cost, node.state, action, action))
+        path.append(node)
+
+    return path
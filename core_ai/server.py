@@ -0,0 +1,379 @@
+"""
+Local fingering service: a small HTTP/1.1 server (stdlib asyncio) in
+front of a pre-warmed worker pool, so tools can ask for fingerings
+without importing core_ai themselves.
+
+    python -m core_ai.server --port 8765 -w 4
+    python -m core_ai.server --unix /tmp/fingering.sock
+
+    POST /solve    {"riff": "E2 A2 [E3 G3 B3]", "timeout": 2.0}
+    GET  /metrics  counters, latency percentiles and throughput
+    GET  /health
+
+Identical riffs that are in flight at the same time are solved once.
+Each request waits at most its timeout (capped by the server's; the
+solve itself still runs to completion for other waiters), and once
+max_pending distinct riffs are being solved new ones get a 503.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core_ai.api import ENGINES
+from core_ai.batch import _init_worker, solve_riff
+from core_ai.chords import parse_riff, format_riff
+from core_ai.instruments import INSTRUMENTS
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+# Solved by every worker at start-up so the first real request is warm
+WARMUP_RIFF = "E2 A2 D3 G3 B3 E4"
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceMetrics:
+    """
+    Request counters plus a sliding window of recent /solve latencies
+    (window most recent requests) for percentiles and throughput.
+    """
+
+    def __init__(self, window=4096):
+        self.started = time.monotonic()
+        self.counters = Counter()
+        self.statuses = Counter()
+        self.recent = deque(maxlen=window)  # (finished at, latency seconds)
+
+    def observe(self, status, latency):
+        self.statuses[status] += 1
+        self.recent.append((time.monotonic(), latency))
+
+    def snapshot(self, in_flight=0):
+        now = time.monotonic()
+        uptime = now - self.started
+        latencies = sorted(latency for _, latency in self.recent)
+        answered = sum(self.statuses.values())
+
+        # Throughput over the last 10 seconds of the window
+        last = [t for t, _ in self.recent if now - t <= 10.0]
+        span = min(10.0, uptime) or 1.0
+
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": self.counters["requests"],
+            "solve_requests": answered,
+            "computations": self.counters["computations"],
+            "coalesced": self.counters["coalesced"],
+            "timeouts": self.counters["timeouts"],
+            "rejected": self.counters["rejected"],
+            "in_flight": in_flight,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "throughput_rps": round(answered / uptime, 2) if uptime else 0.0,
+            "recent_rps": round(len(last) / span, 2),
+            "latency_ms": latency_summary(latencies),
+        }
+
+
+def latency_summary(latencies):
+    """p50/p90/p99/max/mean in milliseconds of a sorted list of seconds."""
+    if not latencies:
+        return {}
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    return {
+        "p50": round(percentile(0.50) * 1000, 3),
+        "p90": round(percentile(0.90) * 1000, 3),
+        "p99": round(percentile(0.99) * 1000, 3),
+        "max": round(latencies[-1] * 1000, 3),
+        "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+
+
+def _http_error(error):
+    return {"error": {"type": "http", "message": str(error)}}
+
+
+def _is_riff(riff):
+    """Riff text, or a list of note names and lists of note names (chords)."""
+    if isinstance(riff, str):
+        return True
+    return isinstance(riff, list) and all(
+        isinstance(event, str) or
+        isinstance(event, list) and all(isinstance(note, str) for note in event)
+        for event in riff)
+
+
+def _init_warm_worker(engine, cache_path=None, instrument="standard"):
+    """Pool initializer: builds the worker's models and solves a warm-up riff."""
+    _init_worker(engine, cache_path, instrument)
+    solve_riff(0, WARMUP_RIFF)
+
+
+class FingeringService:
+    """
+    Dispatches riffs to a process pool (workers=0 solves on one thread in
+    this process) and keeps one future per distinct in-flight riff.
+    """
+
+    def __init__(self, workers=None, engine="astar", instrument="standard", cache_path=None,
+                 timeout=10.0, max_pending=256, max_body=1024 * 1024):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if instrument not in INSTRUMENTS:
+            raise ValueError(f"Unknown instrument: {instrument}")
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.engine = engine
+        self.instrument = instrument
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.max_body = max_body
+
+        self.metrics = ServiceMetrics()
+        self._executor = None
+        self._in_flight = {}  # riff text -> asyncio future of its record
+
+    async def start(self):
+        """Starts the pool and waits until every worker has solved a warm-up riff."""
+        initargs = (self.engine, self.cache_path, self.instrument)
+        if self.workers == 0:
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=_init_warm_worker,
+                                                initargs=initargs)
+            count = 1
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=_init_warm_worker,
+                                                 initargs=initargs)
+            count = self.workers
+
+        # Workers start (and warm up) lazily; one task each brings them all up
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, os.getpid)
+                               for _ in range(count)))
+
+    def close(self):
+        # Waiting lets the pool's manager thread exit before interpreter shutdown
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def solve(self, riff, timeout=None):
+        """
+        Solves one riff (text or event list) and returns (status, body).
+        Joins an identical in-flight computation if there is one.
+        """
+        riff = parse_riff(riff) if isinstance(riff, str) else [
+            tuple(event) if isinstance(event, list) else event for event in riff]
+        key = format_riff(riff)
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.metrics.counters["coalesced"] += 1
+        elif len(self._in_flight) >= self.max_pending:
+            self.metrics.counters["rejected"] += 1
+            return 503, {"error": {"type": "overloaded",
+                                   "message": f"{self.max_pending} riffs already pending"}}
+        else:
+            self.metrics.counters["computations"] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, solve_riff, 0, riff)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        try:
+            # shield: a timed-out waiter must not cancel the shared computation
+            record = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.metrics.counters["timeouts"] += 1
+            return 504, {"error": {"type": "timeout",
+                                   "message": f"No fingering within {timeout:g} s"}}
+        except Exception as e:
+            return 500, {"error": {"type": "exception", "message": f"{type(e).__name__}: {e}"}}
+
+        body = {"riff": key, "path": record["path"], "analysis": record["analysis"]}
+        if record["error"]:
+            body["error"] = record["error"]
+            return 422, body
+        return 200, body
+
+    def _forget(self, key, future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    async def dispatch(self, method, target, body):
+        """Routes one request and returns (status, JSON-serializable body)."""
+        self.metrics.counters["requests"] += 1
+        path = target.split("?", 1)[0]
+
+        if path == "/solve":
+            if method != "POST":
+                raise HttpError(405, "Use POST /solve")
+            started = time.perf_counter()
+            try:
+                request = json.loads(body or b"{}")
+                riff = request["riff"]
+                if not _is_riff(riff):
+                    raise TypeError(riff)
+                timeout = request.get("timeout")
+                timeout = None if timeout is None else float(timeout)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise HttpError(400, 'Expected a JSON object with a "riff" (and optional '
+                                     '"timeout")')
+            status, payload = await self.solve(riff, timeout)
+            self.metrics.observe(status, time.perf_counter() - started)
+            return status, payload
+
+        if method != "GET":
+            raise HttpError(405, f"Use GET {path}")
+        if path == "/metrics":
+            return 200, self.metrics.snapshot(len(self._in_flight))
+        if path == "/health":
+            return 200, {"status": "ok", "engine": self.engine, "instrument": self.instrument,
+                         "workers": self.workers}
+        raise HttpError(404, f"Unknown path: {path}")
+
+    async def handle_connection(self, reader, writer):
+        """Serves keep-alive HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.max_body)
+                except HttpError as e:
+                    # The rest of the stream cannot be trusted, answer and close
+                    await write_response(writer, e.status, _http_error(e), keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload = e.status, _http_error(e)
+
+                headers = {"Retry-After": "1"} if status == 503 else None
+                await write_response(writer, status, payload, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None, ready=None):
+        """
+        Starts the pool, then serves until cancelled. ready(address) is
+        called once the socket is listening.
+        """
+        await self.start()
+        try:
+            if unix_path:
+                server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+                address = unix_path
+            else:
+                server = await asyncio.start_server(self.handle_connection, host, port)
+                address = "%s:%d" % server.sockets[0].getsockname()[:2]
+            if ready is not None:
+                ready(address)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+async def read_request(reader, max_body):
+    """
+    Reads one HTTP/1.1 request. Returns (method, target, headers, body),
+    or None when the client closed the connection between requests.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "Bad Content-Length")
+    if length > max_body:
+        raise HttpError(413, f"Body larger than {max_body} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+async def write_response(writer, status, payload, keep_alive=True, headers=None):
+    body = json.dumps(payload).encode()
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+             "Content-Type: application/json",
+             f"Content-Length: {len(body)}",
+             "Connection: " + ("keep-alive" if keep_alive else "close")]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core_ai.server", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores, 0 = in-process)")
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES), default="astar")
+    parser.add_argument("-i", "--instrument", choices=list(INSTRUMENTS), default="standard")
+    parser.add_argument("--cache", metavar="PATH", help="SQLite result cache")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="longest a request may wait, in seconds")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="distinct riffs solved at once before answering 503")
+    args = parser.parse_args(argv)
+
+    service = FingeringService(args.workers, args.engine, args.instrument, args.cache,
+                               args.timeout, args.max_pending)
+
+    def ready(address):
+        # First line on stdout, so scripts can wait for it (and learn the port)
+        print(f"listening on {address}", flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+from collections import deque
+import numpy as np
+
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import initial_rank, advance_layer
+
+
+class StreamingFingeringSolver:
+    """
+    Fixed-lag Viterbi solver for live note input.
+
+    Notes are pushed one at a time. The solver keeps a rolling DP frontier
+    and commits a fingering as soon as every surviving hypothesis agrees on
+    it, or when it is older than max_lag notes. Memory and per-note work
+    are bounded by max_lag regardless of how long the performance runs.
+    With a large enough lag the committed path equals the offline optimum.
+    """
+
+    def __init__(self, max_lag=32, mapper=None, cost_calculator=None):
+        if max_lag < 1:
+            raise ValueError("max_lag must be at least 1")
+
+        self.problem = GuitarPathProblem([], mapper, cost_calculator)
+        self.mapper = self.problem.mapper
+        self.max_lag = max_lag
+        self.reset()
+
+    def reset(self):
+        """Forgets all pending and committed notes."""
+        self.committed_count = 0
+        # Uncommitted layers, oldest first: (positions, backpointers)
+        self.window = deque()
+        # Table indices of the newest layer's candidates
+        self.indices = None
+        self.g = None
+        self.rank = None
+        self.rank_of = None
+
+    def push(self, note_name):
+        """
+        Adds one note and returns the list of (string, fret) positions
+        committed by it (possibly empty).
+        """
+        midi_val = self.mapper.note_to_midi(note_name)
+        if midi_val is None:
+            raise ValueError(f"Cannot parse note '{note_name}'")
+
+        candidates = self.mapper.find_positions_on_fretboard(midi_val)
+        if not candidates:
+            raise ValueError(f"Note '{note_name}' is not playable on the fretboard")
+
+        positions = np.array(candidates, dtype=np.int64)
+        indices = self.problem.layer_indices(positions)
+
+        if self.g is None:
+            start = self.problem.initial
+            self.g = np.array([self.problem.path_cost(0, start, a, a) for a in candidates])
+            self.rank, self.rank_of = initial_rank(self.g)
+            self.window.append((positions, None))
+        else:
+            cost = self.problem.index_cost_matrix(self.indices, indices)
+            bp, self.g, self.rank, self.rank_of = advance_layer(
+                self.g, self.rank, self.rank_of, cost)
+            self.window.append((positions, bp.astype(np.uint8)))
+        self.indices = indices
+
+        committed = self._commit_agreed()
+        if len(self.window) > self.max_lag:
+            committed += self._force_commit()
+        return committed
+
+    def flush(self):
+        """
+        Ends the input: commits every pending note along the best hypothesis
+        and resets the frontier for a new phrase.
+        """
+        if self.g is None:
+            return []
+
+        best = int(self.rank[0])
+        committed = self._trace(best, len(self.window))
+        self.window.clear()
+        self.g = self.rank = self.rank_of = None
+        return committed
+
+    def _survivor_ancestors(self):
+        """
+        Walks back from every live frontier hypothesis and returns the set
+        of candidate indices alive at each window layer, newest first.
+        """
+        alive = set(np.flatnonzero(np.isfinite(self.g)).tolist())
+        sets = [alive]
+        for _, bp in reversed(self.window):
+            if bp is None:
+                break
+            alive = {int(bp[j]) for j in alive}
+            sets.append(alive)
+        return sets
+
+    def _commit_agreed(self):
+        sets = self._survivor_ancestors()
+
+        # Newest layer (excluding the frontier) that all survivors share
+        for depth, alive in enumerate(sets):
+            if depth > 0 and len(alive) == 1:
+                layer_count = len(self.window) - depth
+                return self._commit(next(iter(alive)), layer_count)
+        return []
+
+    def _force_commit(self):
+        """
+        Commits the oldest pending note along the current best hypothesis
+        and prunes every hypothesis that disagrees with it.
+        """
+        j = int(self.rank[0])
+        ancestors = np.arange(len(self.g))
+        for _, bp in list(self.window)[:0:-1]:
+            ancestors = bp[ancestors]
+            j = int(bp[j])
+
+        self.g = np.where(ancestors == j, self.g, np.inf)
+        return self._commit(j, 1)
+
+    def _commit(self, index, layer_count):
+        """
+        Emits the oldest layer_count window layers, ending at candidate
+        index of the last one, and drops them from the window.
+        """
+        committed = self._trace_window(index, layer_count)
+        for _ in range(layer_count):
+            self.window.popleft()
+        # The new oldest layer points back into committed notes only
+        self.window[0] = (self.window[0][0], None)
+        self.committed_count += layer_count
+        return committed
+
+    def _trace(self, index, layer_count):
+        committed = self._trace_window(index, layer_count)
+        self.committed_count += layer_count
+        return committed
+
+    def _trace_window(self, index, layer_count):
+        path = []
+        for positions, bp in reversed(list(self.window)[:layer_count]):
+            s, f = positions[index]
+            path.append((int(s), int(f)))
+            if bp is not None:
+                index = int(bp[index])
+        path.reverse()
+        return path
+
+
+def stream_fingerings(notes, max_lag=32, mapper=None, cost_calculator=None):
+    """
+    Generator interface: yields (string, fret) positions for an iterable of
+    notes as soon as they are committed, and flushes at the end.
+    """
+    solver = StreamingFingeringSolver(max_lag, mapper, cost_calculator)
+    for note_name in notes:
+        yield from solver.push(note_name)
+    yield from solver.flush()
@@ -1,11 +1,36 @@
 from gui.input_panel import InputPanel
 from gui.fretboard_view import FretboardView
-from core_ai.api import run_fingering_algorithm
+from core_ai.incremental import IncrementalSolver
+from core_ai.kbest import KBestFingerings
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.api import calculate_final_metrics, run_fingering_algorithm
+from core_ai.chords import parse_riff, has_chords, event_positions
 from core_ai.fretboard import Fretboard
 from audio.player import GuitarSoundPlayer
 from core_ai.note_mapping import NoteMapper
+from core_ai.instruments import INSTRUMENTS
+from core_ai.progress import Progress, SolveCancelled
+import queue
+import threading
 import tkinter as tk
 
+POLL_MS = 50
+
+
+def iter_alternatives(riff, mapper, solved_path):
+    """
+    Lazily yields (path, total_cost) for the fingerings of riff other than
+    solved_path, cheapest first. Nothing is computed before the first next(),
+    so the enumeration is built on whichever thread starts it.
+    """
+    problem = GuitarPathProblem(riff, mapper)
+    # The enumeration may start with the solved fingering (or list it later,
+    # after equal-cost ones); it is never shown twice
+    for alternative in KBestFingerings(problem):
+        if alternative[0] != solved_path:
+            yield alternative
+
+
 class GuitarAIApp:
     def __init__(self, root):
         self.fretboard_model = Fretboard()
@@ -15,7 +40,31 @@ class GuitarAIApp:
         self.root.configure(bg="#121212")
         self.sound_player = GuitarSoundPlayer()
         self.note_mapper = NoteMapper()
+        # Keeps DP tables between CALCULATE clicks so edits re-solve fast
+        self.solver = IncrementalSolver(self.note_mapper)
         self.current_path = []
+        self.current_riff = []
+
+        # Background solves: the Progress of the latest one, finished
+        # results handed back to the Tk thread, and a lock so a stale solve
+        # never touches the IncrementalSolver at the same time as a new one
+        self.solve_progress = None
+        self.solve_results = queue.Queue()
+        self.solve_lock = threading.Lock()
+
+        # Background rendering for playback; only the latest request plays
+        self.play_generation = 0
+        self.play_lock = threading.Lock()
+
+        # Lazily enumerated alternative fingerings of current_riff; entry 0
+        # of the cache is the solved fingering itself
+        self.solved_path = []
+        self.alternatives = None
+        self.alternative_cache = []
+        self.alternative_index = 0
+        # Background enumeration of the next alternative, like solve_progress
+        self.alternative_progress = None
+        self.alternative_results = queue.Queue()
 
         self.fretboard = FretboardView(self.root, self.fretboard_model)
         self.input_panel = InputPanel(
@@ -24,9 +73,30 @@ class GuitarAIApp:
             self.fretboard.next_step,
             self.fretboard.prev_step,
             self.fretboard.show_full_path,
-            self.play_solution
+            self.play_solution,
+            self.next_alternative,
+            list(INSTRUMENTS),
+            self.set_instrument
         )
 
+    def set_instrument(self, name):
+        """Switches tuning / instrument; every model comes from the registry."""
+        if self.solve_progress is not None:
+            self.solve_progress.cancel()
+            self.solve_progress = None
+            self.input_panel.hide_progress()
+
+        self.fretboard_model = Fretboard(instrument=name)
+        self.note_mapper = NoteMapper(instrument=name)
+        with self.solve_lock:
+            self.solver = IncrementalSolver(self.note_mapper)
+        self.current_path = []
+        self.current_riff = []
+        self.solved_path = []
+        self._reset_alternatives()
+        self.fretboard.set_fretboard(self.fretboard_model)
+        self.input_panel.set_message(f"Instrument: {name}")
+
     def on_solve(self, riff_text):
 
         if riff_text == "RANDOM_GENERATE":
@@ -36,29 +106,169 @@ class GuitarAIApp:
             self.input_panel.riff_entry.delete(0, tk.END)
             self.input_panel.riff_entry.insert(0, riff_text)
 
-        riff = riff_text.strip().split()
+        # A new solve (or clearing the riff) supersedes the running one
+        if self.solve_progress is not None:
+            self.solve_progress.cancel()
+            self.solve_progress = None
+            self.input_panel.hide_progress()
+        self._reset_alternatives()
+
+        riff = parse_riff(riff_text)
         if not riff:
             self.fretboard.load_path([])
             self.input_panel.update_stats({"stretch": 0, "string": 0, "pos": 0, "total": 0})
             self.input_panel.set_message("Please enter some notes.")
             return
 
+        progress = Progress()
+        self.solve_progress = progress
+
+        perf = self.input_panel.perf_var.get()
+        threading.Thread(target=self._solve_worker, args=(riff, progress, perf),
+                         daemon=True).start()
+        self.input_panel.set_message("Solving...")
+        self.root.after(POLL_MS, self._poll_solve, progress)
+
+    def _solve_worker(self, riff, progress, perf):
+        """Runs on a worker thread; the result is picked up by _poll_solve."""
         try:
-            path, analysis = run_fingering_algorithm(riff)
+            with self.solve_lock:
+                if perf:
+                    result = run_fingering_algorithm(riff, mapper=self.note_mapper,
+                                                     perf=True, progress=progress)
+                elif has_chords(riff):
+                    result = run_fingering_algorithm(riff, mapper=self.note_mapper,
+                                                     progress=progress)
+                else:
+                    result = self.solver.solve(riff, progress)
+        except SolveCancelled:
+            return
+        except Exception as e:
+            self.solve_results.put((progress, riff, None, e))
+            return
+        self.solve_results.put((progress, riff, result, None))
+
+    def _poll_solve(self, progress):
+        """Tk-thread side of a background solve: shows progress, applies the result."""
+        if progress is not self.solve_progress:
+            return  # Superseded; the newer solve has its own poll loop
 
-            if len(path) < len(riff):
-                self.input_panel.set_message("Warning: Some notes are out of range!", is_error=True)
-            else:
-                self.input_panel.set_message("Success: Path calculated.", is_error=False)
+        while True:
+            try:
+                done_progress, riff, result, error = self.solve_results.get_nowait()
+            except queue.Empty:
+                break
+            if done_progress is progress:
+                self.solve_progress = None
+                self.input_panel.hide_progress()
+                self._apply_solution(riff, result, error)
+                return
 
-            if path:
-                self.fretboard.load_path(path)
-                self.fretboard.show_full_path()
-                self.input_panel.update_stats(analysis)
-                self.current_path = path
+        self.input_panel.show_progress(progress.done, progress.total, progress.unit)
+        self.root.after(POLL_MS, self._poll_solve, progress)
+
+    def _apply_solution(self, riff, result, error):
+        if error is not None:
+            self.input_panel.set_message(f"Error: {str(error)}", is_error=True)
+            return
 
+        path, analysis = result
+        if len(path) < len(riff):
+            self.input_panel.set_message("Warning: Some notes are out of range!", is_error=True)
+        else:
+            self.input_panel.set_message("Success: Path calculated.", is_error=False)
+
+        if path:
+            self.fretboard.load_path(path)
+            self.fretboard.show_full_path()
+            self.input_panel.update_stats(analysis)
+            self.current_path = path
+            self.solved_path = path
+        self.input_panel.update_perf(analysis.get("perf"))
+
+        self.current_riff = riff
+        self._reset_alternatives()
+
+    def _reset_alternatives(self):
+        """Forgets the alternatives of the previous riff, dropping a running search."""
+        if self.alternative_progress is not None:
+            self.alternative_progress.cancel()
+            self.alternative_progress = None
+            self.input_panel.hide_progress()
+        self.alternatives = None
+
+    def next_alternative(self):
+        """Shows the next cheapest fingering, wrapping around at the end."""
+        if not self.current_path or has_chords(self.current_riff):
+            return
+        if self.solve_progress is not None or self.alternative_progress is not None:
+            return  # The running solve or search answers first
+
+        if self.alternatives is None:
+            self.alternatives = iter_alternatives(self.current_riff, self.note_mapper,
+                                                  self.solved_path)
+            self.alternative_cache = [(self.solved_path, None)]
+            self.alternative_index = 0
+
+        if self.alternative_index + 1 < len(self.alternative_cache):
+            self._show_alternative(self.alternative_index + 1)
+            return
+
+        # Enumerating the next fingering can take a while on long riffs
+        progress = Progress()
+        progress.update(len(self.alternative_cache) - 1, 0, "alternatives")
+        self.alternative_progress = progress
+        threading.Thread(target=self._alternative_worker, args=(self.alternatives, progress),
+                         daemon=True).start()
+        self.root.after(POLL_MS, self._poll_alternative, progress)
+
+    def _alternative_worker(self, alternatives, progress):
+        """Runs on a worker thread; the result is picked up by _poll_alternative."""
+        try:
+            alternative = next(alternatives, None)
         except Exception as e:
-            self.input_panel.set_message(f"Error: {str(e)}", is_error=True)
+            self.alternative_results.put((progress, None, e))
+            return
+        self.alternative_results.put((progress, alternative, None))
+
+    def _poll_alternative(self, progress):
+        """Tk-thread side of next_alternative's background search."""
+        if progress is not self.alternative_progress:
+            return  # Superseded by a new riff or instrument
+
+        while True:
+            try:
+                done_progress, alternative, error = self.alternative_results.get_nowait()
+            except queue.Empty:
+                break
+            if done_progress is progress:
+                self.alternative_progress = None
+                self.input_panel.hide_progress()
+                if error is not None:
+                    self.input_panel.set_message(f"Error: {str(error)}", is_error=True)
+                elif alternative is None:
+                    self._show_alternative(0)
+                else:
+                    self.alternative_cache.append(alternative)
+                    self._show_alternative(len(self.alternative_cache) - 1)
+                return
+
+        self.input_panel.show_progress(progress.done, progress.total, progress.unit)
+        self.root.after(POLL_MS, self._poll_alternative, progress)
+
+    def _show_alternative(self, index):
+        self.alternative_index = index
+        path, _ = self.alternative_cache[index]
+        analysis = calculate_final_metrics(path, self.solver.evaluator)
+
+        self.current_path = path
+        self.fretboard.load_path(path)
+        self.fretboard.show_full_path()
+        self.input_panel.update_stats(analysis)
+        if index == 0:
+            self.input_panel.set_message("Best fingering")
+        else:
+            self.input_panel.set_message(f"Alternative #{index}")
 
     def play_solution(self):
         if not self.current_path:
@@ -66,10 +276,25 @@ class GuitarAIApp:
 
         notes = []
 
-        for string, fret in self.current_path:
-            open_midi = self.note_mapper.tuning[string]
-            midi = open_midi + fret
-            note_name = self.note_mapper.midi_to_note_name(midi)
-            notes.append(note_name)
+        for entry in self.current_path:
+            names = []
+            for string, fret in event_positions(entry):
+                open_midi = self.note_mapper.tuning[string]
+                midi = open_midi + fret
+                names.append(self.note_mapper.midi_to_note_name(midi))
+            # Chords are played as one simultaneous group
+            notes.append(names[0] if len(names) == 1 else names)
+
+        # Render off the Tk thread; a newer PLAY click wins
+        self.play_generation += 1
+        self.sound_player.stop()
+        threading.Thread(target=self._play_worker, args=(notes, self.play_generation),
+                         daemon=True).start()
 
-        self.sound_player.play_notes(notes)
+    def _play_worker(self, notes, generation):
+        with self.play_lock:
+            if generation != self.play_generation:
+                return
+            buffer = self.sound_player.render(notes)
+            if generation == self.play_generation:
+                self.sound_player.play_buffer(buffer)
@@ -1,4 +1,7 @@
 import tkinter as tk
+from core_ai.chords import event_positions
+
+RESIZE_DELAY_MS = 80
 
 
 class FretboardView:
@@ -8,10 +11,7 @@ class FretboardView:
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Configuration
-        self.fretboard = fretboard
-        self.strings = fretboard.num_strings
-        self.frets = fretboard.num_frets
-        self.string_order = list(range(1,self.strings+1))
+        self.configure_board(fretboard)
 
         self.margin_x = 60
         self.margin_y = 50
@@ -21,57 +21,118 @@ class FretboardView:
         self.full_path = []
         self.current_step = 0
 
-        # Redraw when window is resized
-        self.canvas.bind("<Configure>", lambda e: self.draw_fretboard())
+        # Static board items, created once and moved on resize
+        self.board_items = None
+        self.resize_job = None
 
-    def draw_fretboard(self):
-        self.canvas.delete("all")
+        # Drawn path, one record per step: (notes, item ids) where notes
+        # are (string, fret, offset index) in drawing order
+        self.drawn_steps = []
+        self.coord_counts = {}
+
+        # Redraw (debounced) when window is resized
+        self.canvas.bind("<Configure>", self.on_resize)
+
+    def configure_board(self, fretboard):
+        self.fretboard = fretboard
+        self.strings = fretboard.num_strings
+        self.frets = fretboard.num_frets
+        self.string_order = list(range(1,self.strings+1))
+        self.string_row = {s_num: i for i, s_num in enumerate(self.string_order)}
+
+    def set_fretboard(self, fretboard):
+        """Switches to another instrument's board, clearing the path."""
+        self.load_path([])
+        self.canvas.delete("board")
+        self.board_items = None
+        self.configure_board(fretboard)
+        if self.canvas.winfo_width() > 1:
+            self.draw_fretboard()
+
+    def on_resize(self, event=None):
+        if self.board_items is None:
+            self.draw_fretboard()
+            return
+        if self.resize_job is not None:
+            self.canvas.after_cancel(self.resize_job)
+        self.resize_job = self.canvas.after(RESIZE_DELAY_MS, self.relayout)
+
+    def update_geometry(self):
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
+        self.usable_w = w - (self.margin_x * 2)
+        self.usable_h = h - (self.margin_y * 2)
+        self.cell_width = self.usable_w / self.frets
+        self.cell_height = self.usable_h / (self.strings - 1)
 
-        usable_w = w - (self.margin_x * 2)
-        usable_h = h - (self.margin_y * 2)
-
-        self.cell_width = usable_w / self.frets
-        self.cell_height = usable_h / (self.strings - 1)
+    def draw_fretboard(self):
+        """Creates the static board once; later resizes only move its items."""
+        self.update_geometry()
 
         # Draw Fretboard Wood Background
-        self.canvas.create_rectangle(
-            self.margin_x, self.margin_y,
-            self.margin_x + usable_w, self.margin_y + usable_h,
-            fill="#2a2a2a", outline="#444", width=2
-        )
+        background = self.canvas.create_rectangle(0, 0, 0, 0, fill="#2a2a2a", outline="#444",
+                                                  width=2, tags="board")
 
         # Draw Frets (Vertical Lines)
+        frets = []
         for f in range(self.frets + 1):
-            x = self.margin_x + (f * self.cell_width)
             # Nut (Fret 0) is thicker and golden
             color = "#f1c40f" if f == 0 else "#888"
             width = 4 if f == 0 else 2
-            self.canvas.create_line(x, self.margin_y, x, self.margin_y + usable_h, fill=color, width=width)
+            line = self.canvas.create_line(0, 0, 0, 0, fill=color, width=width, tags="board")
 
             # Fret Numbers
+            label = None
             if f > 0:
-                self.canvas.create_text(x - (self.cell_width / 2), self.margin_y - 20,
-                                        text=str(f), fill="#666", font=("Arial", 10))
+                label = self.canvas.create_text(0, 0, text=str(f), fill="#666",
+                                                font=("Arial", 10), tags="board")
+            frets.append((line, label))
 
         # Draw Strings (Horizontal Lines)
+        strings = []
         for i, s_num in enumerate(self.string_order):
-            y = self.margin_y + (i * self.cell_height)
             # Higher strings are thinner visually
             thickness = 1 + (i * 0.5)
-            self.canvas.create_line(self.margin_x, y, self.margin_x + usable_w, y, fill="#d1d1d1", width=thickness)
+            line = self.canvas.create_line(0, 0, 0, 0, fill="#d1d1d1", width=thickness, tags="board")
 
             # String Labels on the left
-            string_names = {1: "E", 2: "B", 3: "G", 4: "D", 5: "A", 6: "E"}
-            self.canvas.create_text(self.margin_x - 30, y, text=string_names[s_num], fill="#888",
-                                    font=("Arial", 12, "bold"))
+            label = self.canvas.create_text(0, 0, text=self.fretboard.string_names[s_num],
+                                            fill="#888", font=("Arial", 12, "bold"), tags="board")
+            strings.append((line, label))
+
+        self.board_items = (background, frets, strings)
+        self.canvas.tag_lower("board")
+        self.relayout()
+
+    def relayout(self):
+        """Moves board and path items to the current canvas size."""
+        self.resize_job = None
+        self.update_geometry()
+        background, frets, strings = self.board_items
+
+        left, top = self.margin_x, self.margin_y
+        right, bottom = left + self.usable_w, top + self.usable_h
+        self.canvas.coords(background, left, top, right, bottom)
+
+        for f, (line, label) in enumerate(frets):
+            x = left + (f * self.cell_width)
+            self.canvas.coords(line, x, top, x, bottom)
+            if label is not None:
+                self.canvas.coords(label, x - (self.cell_width / 2), top - 20)
+
+        for i, (line, label) in enumerate(strings):
+            y = top + (i * self.cell_height)
+            self.canvas.coords(line, left, y, right, y)
+            self.canvas.coords(label, left - 30, y)
 
-        # Redraw path if it exists
-        if self.full_path:
-            self.draw_single_step(self.current_step)
+        prev_coords = None
+        for notes, items in self.drawn_steps:
+            prev_coords = self._place_step(notes, items, prev_coords)
 
     def load_path(self, path):
+        self.canvas.delete("path_element")
+        self.drawn_steps = []
+        self.coord_counts = {}
         self.full_path = path
         self.current_step = 0
 
@@ -90,51 +151,84 @@ class FretboardView:
             self.draw_single_step(self.current_step)
 
     def draw_single_step(self, step_count):
-        self.canvas.delete("path_element")
-        if self.cell_width <= 0 or step_count == 0:
-            return
-
+        """Adds or removes steps at the end so exactly step_count are drawn."""
+        while len(self.drawn_steps) > step_count:
+            self._remove_last_step()
+        while len(self.drawn_steps) < step_count:
+            self._add_step(self.full_path[len(self.drawn_steps)])
+
+    def note_coords(self, s_num, fret, offset_index):
+        # Calculate X (Handle open strings at fret 0)
+        if fret == 0:
+            base_x = self.margin_x - 15
+        else:
+            base_x = self.margin_x + (fret * self.cell_width) - (self.cell_width / 2)
+
+        base_y = self.margin_y + (self.string_row[s_num] * self.cell_height)
+
+        # Offset logic for same-position notes
+        offset = offset_index * 5
+        return base_x + offset, base_y + offset
+
+    def _add_step(self, entry):
+        step = len(self.drawn_steps) + 1
         prev_coords = None
-        # Track overlapping notes to offset them slightly
-        coord_counts = {}
-
-        for step, (s_num, fret) in enumerate(self.full_path[:step_count], 1):
-            row_index = self.string_order.index(s_num)
+        for notes, _ in reversed(self.drawn_steps):
+            prev_coords = self._first_coords(notes)
+            if prev_coords:
+                break
 
+        # Chord entries draw every note with the same step number
+        notes = []
+        items = []
+        for s_num, fret in event_positions(entry):
             if not self.fretboard.is_valid_position(s_num, fret):
                 continue
-
-            # Calculate X (Handle open strings at fret 0)
-            if fret == 0:
-                base_x = self.margin_x - 15
-            else:
-                base_x = self.margin_x + (fret * self.cell_width) - (self.cell_width / 2)
-
-            base_y = self.margin_y + (row_index * self.cell_height)
-
-            # Offset logic for same-position notes
-            coord_counts[(s_num, fret)] = coord_counts.get((s_num, fret), 0) + 1
-            offset = (coord_counts[(s_num, fret)] - 1) * 5
-            x, y = base_x + offset, base_y + offset
-
-            # Draw Connection Line (Arrow)
-            if prev_coords:
-                self.canvas.create_line(
-                    prev_coords[0], prev_coords[1], x, y,
-                    fill="#ff0077", width=2, arrow=tk.LAST,
+            offset_index = self.coord_counts.get((s_num, fret), 0)
+            self.coord_counts[(s_num, fret)] = offset_index + 1
+            notes.append((s_num, fret, offset_index))
+
+            # Connection Line (Arrow) to the first note of this step
+            if prev_coords and len(notes) == 1:
+                items.append(self.canvas.create_line(
+                    0, 0, 0, 0, fill="#ff0077", width=2, arrow=tk.LAST,
                     dash=(4, 2), tags="path_element"
-                )
-
-            # Draw Note Circle
-            self.canvas.create_oval(
-                x - 14, y - 14, x + 14, y + 14,
-                fill="#ff0077", outline="white", width=2, tags="path_element"
-            )
-
-            # Draw Step Number
-            self.canvas.create_text(
-                x, y, text=str(step), fill="white",
+                ))
+
+            # Note Circle and Step Number
+            items.append(self.canvas.create_oval(
+                0, 0, 0, 0, fill="#ff0077", outline="white", width=2, tags="path_element"
+            ))
+            items.append(self.canvas.create_text(
+                0, 0, text=str(step), fill="white",
                 font=("Arial", 11, "bold"), tags="path_element"
-            )
-
-            prev_coords = (x, y)
\ No newline at end of file
+            ))
+
+        self._place_step(notes, items, prev_coords)
+        self.drawn_steps.append((notes, items))
+
+    def _remove_last_step(self):
+        notes, items = self.drawn_steps.pop()
+        for item in items:
+            self.canvas.delete(item)
+        for s_num, fret, _ in notes:
+            self.coord_counts[(s_num, fret)] -= 1
+
+    def _first_coords(self, notes):
+        if not notes:
+            return None
+        return self.note_coords(*notes[0])
+
+    def _place_step(self, notes, items, prev_coords):
+        """
+        Sets the coordinates of one step's items; returns the coordinates
+        the next step's arrow starts from.
+        """
+        items = iter(items)
+        for k, note in enumerate(notes):
+            x, y = self.note_coords(*note)
+            if prev_coords and k == 0:
+                self.canvas.coords(next(items), prev_coords[0], prev_coords[1], x, y)
+            self.canvas.coords(next(items), x - 14, y - 14, x + 14, y + 14)
+            self.canvas.coords(next(items), x, y)
+        return self._first_coords(notes) or prev_coords
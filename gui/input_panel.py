@@ -1,7 +1,9 @@
 import tkinter as tk
+from tkinter import ttk
 
 class InputPanel:
-    def __init__(self, parent, solve_cb, next_cb, prev_cb, full_cb, play_cb):
+    def __init__(self, parent, solve_cb, next_cb, prev_cb, full_cb, play_cb, alt_cb=None,
+                 instruments=None, instrument_cb=None):
         # Main container
         self.frame = tk.Frame(parent, bg="#1e1e1e", padx=30, pady=20)
         self.frame.pack(fill=tk.X)
@@ -54,11 +56,35 @@ class InputPanel:
                   bg="#1abc9c", fg="black", font=("Arial", 11, "bold"),
                   padx=20, pady=10, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
 
+        # NEXT ALTERNATIVE Button (cycles through k-best fingerings)
+        if alt_cb:
+            tk.Button(self.ctrl_row, text="NEXT ALT", command=alt_cb,
+                      bg="#f1c40f", fg="black", font=("Arial", 11, "bold"),
+                      padx=15, pady=10, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
+
+        # Instrument / tuning selector
+        if instruments and instrument_cb:
+            self.instrument_var = tk.StringVar(value=instruments[0])
+            menu = tk.OptionMenu(self.ctrl_row, self.instrument_var, *instruments,
+                                 command=instrument_cb)
+            menu.config(bg="#d1d1d1", fg="black", relief=tk.FLAT, font=("Arial", 11, "bold"),
+                        highlightthickness=0)
+            menu.pack(side=tk.LEFT, padx=8)
+
+        # PERF toggle: solve with instrumentation and show timings below the stats
+        self.perf_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.ctrl_row, text="PERF", variable=self.perf_var,
+                       bg="#1e1e1e", fg="#aaa", selectcolor="#2d2d2d",
+                       activebackground="#1e1e1e", font=("Arial", 11, "bold")).pack(side=tk.LEFT, padx=8)
+
         # Status Message (Log)
         self.log_label = tk.Label(self.left_side, text="Ready", fg="#888", bg="#1e1e1e",
                                   font=("Arial", 24, "italic"))
         self.log_label.pack(side=tk.BOTTOM, fill=tk.X, pady=(15, 0), anchor="w")
 
+        # Progress of a running background solve (hidden when idle)
+        self.progress_bar = ttk.Progressbar(self.left_side, length=400, mode="determinate")
+
         # --- RIGHT SIDE: ANALYTICS DASHBOARD ---
         self.stats_frame = tk.Frame(self.frame, bg="#252525", padx=30, pady=20,
                                     highlightbackground="#444", highlightthickness=2)
@@ -86,6 +112,10 @@ class InputPanel:
             lbl.pack(side=tk.RIGHT, padx=(25, 0))
             self.stat_labels[key] = lbl
 
+        self.perf_label = tk.Label(self.stats_frame, text="", fg="#888", bg="#252525",
+                                   font=("Consolas", 11), justify=tk.LEFT)
+        self.perf_label.pack(fill=tk.X, pady=(8, 0), anchor="w")
+
     def set_message(self, message, is_error=False):
         """Displays status or error messages in English."""
         color = "#ff4444" if is_error else "#00ffcc"
@@ -95,4 +125,30 @@ class InputPanel:
         """Updates the dashboard values based on the results."""
         for key, value in data.items():
             if key in self.stat_labels:
-                self.stat_labels[key].config(text=f"{value:.1f}")
\ No newline at end of file
+                self.stat_labels[key].config(text=f"{value:.1f}")
+
+    def update_perf(self, perf):
+        """Shows the perf dict of an instrumented solve (clears it when None)."""
+        if not perf:
+            self.perf_label.config(text="")
+            return
+        timings = "  ".join(f"{key[:-3]} {value:.1f}ms" for key, value in perf.items()
+                            if key.endswith("_ms"))
+        counters = "  ".join(f"{key} {value}" for key, value in perf.items()
+                             if not key.endswith("_ms"))
+        self.perf_label.config(text=f"{timings}\n{counters}")
+
+    def show_progress(self, done, total, unit):
+        """Shows solve progress; an unknown total (A*) animates the bar instead."""
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0), before=self.log_label)
+        if total:
+            self.progress_bar.config(mode="determinate", maximum=total, value=done)
+            self.set_message(f"Solving... {done}/{total} {unit}")
+        else:
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.step()
+            self.set_message(f"Solving... {done} {unit}")
+
+    def hide_progress(self):
+        self.progress_bar.pack_forget()
@@ -0,0 +1,89 @@
+import itertools
+import random
+
+import pytest
+
+from core_ai.chords import ChordShapeIndex, parse_riff, format_riff, solve_events, shape_span
+from core_ai.cost import ErgonomicCost
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem, astar_search
+
+NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def note_name(midi):
+    return f"{NAMES[midi % 12]}{midi // 12 - 1}"
+
+
+def brute_force_shapes(mapper, evaluator, midi_values):
+    """Every assignment of one position per note obeying the shape rules."""
+    shapes = set()
+    candidates = [mapper.find_positions_on_fretboard(m) for m in midi_values]
+    for shape in itertools.product(*candidates):
+        strings = [s for s, _ in shape]
+        if len(set(strings)) == len(strings) and shape_span(shape) <= evaluator.MAX_REACHABLE_STRETCH:
+            shapes.add(shape)
+    return shapes
+
+
+@pytest.mark.parametrize("size, max_shapes", [(2, 32), (3, 32), (3, 4)])
+def test_shapes_match_brute_force(size, max_shapes):
+    rng = random.Random(size)
+    mapper = NoteMapper()
+    evaluator = ErgonomicCost()
+    index = ChordShapeIndex(mapper, evaluator)
+    index.MAX_SHAPES = max_shapes
+    for _ in range(60):
+        midi_values = tuple(rng.randint(40, 76) for _ in range(size))
+        expected = brute_force_shapes(mapper, evaluator, midi_values)
+        shapes = index.shapes(midi_values)
+
+        # Caller order: shape[i] plays midi_values[i]
+        for shape, score in shapes:
+            assert shape in expected
+            assert [mapper.tuning[s] + f for s, f in shape] == list(midi_values)
+            assert score == shape_span(shape) * evaluator.FRET_STRETCH_WEIGHT
+
+        scores = [score for _, score in shapes]
+        assert scores == sorted(scores)
+        if len(expected) <= max_shapes:
+            assert {shape for shape, _ in shapes} == expected
+        else:
+            assert len(shapes) == max_shapes
+            dropped = expected - {shape for shape, _ in shapes}
+            assert scores[-1] <= min(shape_span(shape) for shape in dropped) * evaluator.FRET_STRETCH_WEIGHT
+
+
+def test_shape_cache_follows_note_order():
+    index = ChordShapeIndex(NoteMapper(), ErgonomicCost())
+    forward = index.shapes((40, 47, 52))
+    backward = index.shapes((52, 47, 40))
+    assert [shape[::-1] for shape, _ in forward] == [shape for shape, _ in backward]
+
+
+def test_single_note_riffs_cost_what_astar_computes():
+    rng = random.Random(0)
+    mapper = NoteMapper()
+    for _ in range(20):
+        riff = [note_name(rng.randint(40, 86)) for _ in range(rng.randint(1, 30))]
+        problem = GuitarPathProblem(riff, mapper)
+        expected = astar_search(problem)
+        path, total = solve_events(riff, problem)
+        assert total == expected[-1].path_cost
+        assert path == [node.state[:2] for node in expected[1:]]
+
+
+def test_unplayable_events_give_no_path():
+    assert solve_events(["E2", ("E2", "C9")]) == ([], None)
+    # Two notes that only fit on the same string
+    assert solve_events([("E2", "F2")]) == ([], None)
+
+
+def test_parse_and_format_round_trip():
+    text = "A2 [E2 B2 E3] D3 [G3 B3]"
+    riff = parse_riff(text)
+    assert riff == ["A2", ("E2", "B2", "E3"), "D3", ("G3", "B3")]
+    assert format_riff(riff) == text
+    assert parse_riff(format_riff(riff)) == riff
+    # One-note groups and empty groups collapse
+    assert parse_riff("[A2] [] D3") == ["A2", "D3"]
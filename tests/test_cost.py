@@ -0,0 +1,44 @@
+import pytest
+
+from core_ai.api import run_fingering_algorithm, calculate_final_metrics
+from core_ai.cost import ErgonomicCost
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem, astar_search
+
+
+def test_position_indices_rejects_positions_off_the_board():
+    evaluator = ErgonomicCost()
+    with pytest.raises(ValueError):
+        evaluator.position_indices([(1, 23)])
+    with pytest.raises(ValueError):
+        evaluator.position_indices([(7, 0)])
+
+
+def test_final_metrics_match_step_formula_beyond_default_board():
+    evaluator = ErgonomicCost()
+    path = [(1, 20), (1, 23)]
+    analysis = calculate_final_metrics(path, evaluator)
+    assert analysis["total"] == evaluator.calculate_step_cost(*path) == 3.0
+    assert analysis["penalty_count"] == 0
+
+
+def test_24_fret_mapper_with_default_evaluator():
+    mapper = NoteMapper(num_frets=24)
+    riff = ["E6", "D#6", "E6", "B5"]  # Only reachable above fret 22
+    problem = GuitarPathProblem(riff, mapper=mapper, cost_calculator=ErgonomicCost())
+    assert problem.cost_calculator.covers(6, 24)
+    assert astar_search(problem) is not None
+
+    path, analysis = run_fingering_algorithm(riff, mapper=mapper, evaluator=ErgonomicCost())
+    assert max(fret for _, fret in path) > 22
+    expected = sum(ErgonomicCost().calculate_step_cost(a, b) for a, b in zip(path, path[1:]))
+    assert analysis["total"] == round(expected, 2)
+
+
+def test_step_cost_matrix_matches_path_cost():
+    problem = GuitarPathProblem(["E2", "A2"], NoteMapper())
+    board = [(s, f) for s in range(1, 7) for f in range(0, 23, 3)]
+    matrix = problem.step_cost_matrix(board, board)
+    for i, a in enumerate(board):
+        for j, b in enumerate(board):
+            assert matrix[i, j] == problem.path_cost(0, (*a, 0), None, (*b, 1))
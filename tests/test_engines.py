@@ -0,0 +1,102 @@
+import itertools
+import random
+import tracemalloc
+
+import pytest
+
+from core_ai.cost import ErgonomicCost
+from core_ai.kbest import KBestFingerings
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem, astar_search
+from core_ai import search_viterbi
+from core_ai.search_viterbi import viterbi_search, checkpoint_search, checkpoint_positions
+
+NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def random_riff(rng, length, low=40, high=86):
+    return [f"{NAMES[m % 12]}{m // 12 - 1}" for m in (rng.randint(low, high) for _ in range(length))]
+
+
+def random_evaluator(rng):
+    evaluator = ErgonomicCost()
+    evaluator.FRET_STRETCH_WEIGHT = rng.uniform(0.1, 3.0)
+    evaluator.STRING_CHANGE_WEIGHT = rng.uniform(0.1, 5.0)
+    evaluator.OPEN_STRING_BONUS = rng.uniform(-2.0, 0.0)
+    evaluator.MAX_REACHABLE_STRETCH = rng.randint(2, 7)
+    evaluator.ANATOMICAL_PENALTY = rng.uniform(0.0, 30.0)
+    return evaluator
+
+
+def states(path):
+    return [node.state for node in path]
+
+
+# Seeds 4 and 64 produce equal-cost paths whose f = g + h values round
+# to the same float
+@pytest.mark.parametrize("seed", [0, 1, 2, 4, 64])
+def test_layered_engines_match_astar_under_random_weights(seed):
+    rng = random.Random(seed)
+    mapper = NoteMapper()
+    for _ in range(20):
+        riff = random_riff(rng, rng.randint(1, 40), *rng.choice([(40, 86), (52, 64), (60, 70)]))
+        problem = GuitarPathProblem(riff, mapper, random_evaluator(rng))
+        expected = astar_search(problem)
+        for engine in (viterbi_search, checkpoint_search):
+            path = engine(problem)
+            assert path[-1].path_cost == expected[-1].path_cost
+            assert states(path) == states(expected)
+
+
+def test_viterbi_blocks_stitch_like_one_gather(monkeypatch):
+    rng = random.Random(5)
+    problem = GuitarPathProblem(random_riff(rng, 50), NoteMapper(), random_evaluator(rng))
+    expected = viterbi_search(problem)
+    monkeypatch.setattr(search_viterbi, "BLOCK_LAYERS", 3)
+    path = viterbi_search(problem)
+    assert states(path) == states(expected)
+    assert [node.path_cost for node in path] == [node.path_cost for node in expected]
+
+
+def test_kbest_starts_with_astar_path_and_lists_distinct_fingerings():
+    rng = random.Random(7)
+    mapper = NoteMapper()
+    for _ in range(20):
+        riff = random_riff(rng, rng.randint(1, 12), 52, 64)
+        problem = GuitarPathProblem(riff, mapper, random_evaluator(rng))
+        expected = [(s, f) for s, f, _ in states(astar_search(problem))[1:]]
+        alternatives = list(itertools.islice(KBestFingerings(problem), 10))
+        assert alternatives[0][0] == expected
+        assert len({tuple(path) for path, _ in alternatives}) == len(alternatives)
+        costs = [cost for _, cost in alternatives]
+        assert costs == sorted(costs)
+
+
+def _search_state_peak(search, length):
+    """Peak bytes allocated by one search, minus its compact result."""
+    riff = random_riff(random.Random(0), length, 40, 80)
+    mapper = NoteMapper()
+    search(GuitarPathProblem(riff[:50], mapper))  # Warm the mapper and cost tables
+    problem = GuitarPathProblem(riff, mapper)
+    tracemalloc.start()
+    try:
+        result = search(problem)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - getattr(result, "nbytes", 0)
+
+
+def test_checkpoint_search_state_grows_sublinearly():
+    small = _search_state_peak(checkpoint_positions, 2000)
+    large = _search_state_peak(checkpoint_positions, 8000)
+    # √n checkpointing: 4x the notes should cost about 2x the memory
+    assert large < 3 * small
+    assert large < _search_state_peak(viterbi_search, 8000) / 10
+
+
+def test_checkpoint_positions_match_viterbi():
+    rng = random.Random(3)
+    problem = GuitarPathProblem(random_riff(rng, 500), NoteMapper())
+    expected = [(s, f) for s, f, _ in states(viterbi_search(problem))[1:]]
+    assert [tuple(row) for row in checkpoint_positions(problem).tolist()] == expected
@@ -0,0 +1,89 @@
+import random
+
+from core_ai.api import run_fingering_algorithm
+from core_ai.incremental import IncrementalSolver
+from core_ai.note_mapping import NoteMapper
+from core_ai.progress import Progress, SolveCancelled
+
+NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def random_note(rng):
+    if rng.random() < 0.02:
+        return "C9"  # Above the fretboard
+    m = rng.randint(40, 86)
+    return f"{NAMES[m % 12]}{m // 12 - 1}"
+
+
+def random_edit(rng, riff):
+    riff = list(riff)
+    operation = rng.choice(["edit", "insert", "delete", "append", "truncate"])
+    if operation == "edit" and riff:
+        riff[rng.randrange(len(riff))] = random_note(rng)
+    elif operation == "insert":
+        riff.insert(rng.randint(0, len(riff)), random_note(rng))
+    elif operation == "delete" and riff:
+        del riff[rng.randrange(len(riff))]
+    elif operation == "append":
+        riff += [random_note(rng) for _ in range(rng.randint(1, 5))]
+    elif operation == "truncate":
+        del riff[rng.randint(0, len(riff)):]
+    return riff
+
+
+def test_random_edits_match_a_full_solve():
+    rng = random.Random(0)
+    mapper = NoteMapper()
+    solver = IncrementalSolver(mapper)
+    riff = [random_note(rng) for _ in range(20)]
+    for _ in range(300):
+        riff = random_edit(rng, riff)
+        path, analysis = solver.solve(riff)
+        expected_path, expected = run_fingering_algorithm(riff, mapper=mapper)
+        assert analysis["total"] == expected["total"]
+        assert len(path) == len(expected_path)
+
+
+def solve_counting_layers(solver, riff):
+    progress = Progress()
+    solver.solve(riff, progress)
+    return progress.total
+
+
+def test_appends_and_single_edits_recompute_only_the_changed_layers():
+    rng = random.Random(1)
+    solver = IncrementalSolver(NoteMapper())
+    riff = [random_note(rng).replace("C9", "E2") for _ in range(30)]
+
+    assert solve_counting_layers(solver, riff) == 30
+    assert solve_counting_layers(solver, riff) == 0
+
+    for count in (1, 4):
+        riff = riff + ["A2", "D3", "G3", "B3"][:count]
+        assert solve_counting_layers(solver, riff) == count
+
+    # The passes meet where the cached forward columns end, so an edit
+    # costs the layers between that point and the edited note
+    riff[10] = "E4"
+    assert solve_counting_layers(solver, riff) == 1 + 24  # Backward pass built once
+    for i, expected in ((10, 1), (3, 8), (20, 17)):
+        riff[i] = "G3" if riff[i] != "G3" else "A3"
+        assert solve_counting_layers(solver, riff) == expected
+
+
+def test_cancelled_solve_leaves_a_usable_cache():
+    rng = random.Random(2)
+    mapper = NoteMapper()
+    solver = IncrementalSolver(mapper)
+    riff = [random_note(rng).replace("C9", "E2") for _ in range(40)]
+    solver.solve(riff[:20])
+
+    progress = Progress()
+    progress.cancel()
+    try:
+        solver.solve(riff, progress)
+    except SolveCancelled:
+        pass
+
+    _, analysis = solver.solve(riff)
+    assert analysis["total"] == run_fingering_algorithm(riff, mapper=mapper)[1]["total"]
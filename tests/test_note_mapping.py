@@ -0,0 +1,30 @@
+import itertools
+
+import pytest
+
+from core_ai.note_mapping import note_name_to_midi, NoteMapper
+
+music21_note = pytest.importorskip("music21.note")
+
+SPELLINGS = [
+    case(letter) + accidental + octave
+    for letter, case, accidental, octave in itertools.product(
+        "CDEFGAB", (str.upper, str.lower), ("", "#", "##", "-", "--", "b"),
+        [""] + [str(octave) for octave in range(9)])
+]
+
+
+@pytest.mark.parametrize("name", SPELLINGS)
+def test_parser_matches_music21(name):
+    assert note_name_to_midi(name) == music21_note.Note(name).pitch.midi
+
+
+@pytest.mark.parametrize("name", ["C###4", "C10", "E4 "])
+def test_other_spellings_fall_back_to_music21(name):
+    assert note_name_to_midi(name) == music21_note.Note(name).pitch.midi
+
+
+@pytest.mark.parametrize("name", ["Ebb3", "H2", "X", ""])
+def test_unparseable_names_give_none(name):
+    assert note_name_to_midi(name) is None
+    assert NoteMapper().note_to_midi(name) is None
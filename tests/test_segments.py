@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import viterbi_search
+from core_ai.segments import parallel_segment_search, find_split_points
+
+NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def random_riff(rng, length, low=40, high=86):
+    return [f"{NAMES[m % 12]}{m // 12 - 1}" for m in (rng.randint(low, high) for _ in range(length))]
+
+
+def check_against_viterbi(problem, max_segment):
+    stats = {}
+    path = parallel_segment_search(problem, workers=0, max_segment=max_segment, stats=stats)
+    expected = viterbi_search(problem)
+    assert len(path) == len(expected)
+    assert [node.state[2] for node in path] == [node.state[2] for node in expected]
+    assert path[-1].path_cost == pytest.approx(expected[-1].path_cost)
+    return path, expected, stats
+
+
+def test_natural_anchors_only_give_the_viterbi_path():
+    rng = random.Random(0)
+    mapper = NoteMapper()
+    for _ in range(20):
+        # E2 and F2 have a single position, so they split the riff by themselves
+        riff = random_riff(rng, rng.randint(10, 60))
+        for i in rng.sample(range(1, len(riff) - 1), 3):
+            riff[i] = rng.choice(["E2", "F2"])
+        problem = GuitarPathProblem(riff, mapper)
+        path, expected, stats = check_against_viterbi(problem, max_segment=len(riff))
+        assert stats["split_points"] > 0
+        assert [node.state for node in path] == [node.state for node in expected]
+
+
+@pytest.mark.parametrize("max_segment", [2, 3, 5, 8, 20])
+def test_forced_splits_keep_the_optimal_cost(max_segment):
+    rng = random.Random(max_segment)
+    mapper = NoteMapper()
+    for _ in range(12):
+        riff = random_riff(rng, rng.randint(2, 60))
+        problem = GuitarPathProblem(riff, mapper)
+        path, _, stats = check_against_viterbi(problem, max_segment)
+        # Node costs are consistent with the returned positions
+        total = 0
+        for parent, node in zip(path, path[1:]):
+            total = problem.path_cost(total, parent.state, node.state, node.state)
+        assert total == path[-1].path_cost
+
+
+def test_split_points_respect_max_segment():
+    counts = [3] * 100
+    splits = find_split_points(counts, 10)
+    bounds = [0] + splits + [99]
+    assert all(0 < b - a <= 10 for a, b in zip(bounds, bounds[1:]))
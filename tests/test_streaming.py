@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from core_ai.note_mapping import NoteMapper
+from core_ai.search_astar import GuitarPathProblem
+from core_ai.search_viterbi import viterbi_search
+from core_ai.streaming import StreamingFingeringSolver, stream_fingerings
+
+NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+
+def random_riff(rng, length, low=40, high=86):
+    return [f"{NAMES[m % 12]}{m // 12 - 1}" for m in (rng.randint(low, high) for _ in range(length))]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lag_covering_the_riff_gives_the_offline_optimum(seed):
+    rng = random.Random(seed)
+    mapper = NoteMapper()
+    for _ in range(10):
+        riff = random_riff(rng, rng.randint(1, 60))
+        expected = [node.state[:2] for node in viterbi_search(GuitarPathProblem(riff, mapper))[1:]]
+        assert list(stream_fingerings(riff, max_lag=len(riff), mapper=mapper)) == expected
+
+
+@pytest.mark.parametrize("max_lag", [1, 2, 3])
+def test_small_lags_commit_one_playable_position_per_note(max_lag):
+    rng = random.Random(max_lag)
+    mapper = NoteMapper()
+    solver = StreamingFingeringSolver(max_lag, mapper)
+    riff = random_riff(rng, 200)
+
+    committed = []
+    for i, note in enumerate(riff):
+        committed += solver.push(note)
+        # Never more than max_lag notes pending
+        assert i + 1 - len(committed) <= max_lag
+    committed += solver.flush()
+
+    assert len(committed) == len(riff)
+    for (string, fret), note in zip(committed, riff):
+        assert (string, fret) in mapper.find_positions_on_fretboard(mapper.note_to_midi(note))
+    assert solver.flush() == []
+
+
+def test_rejects_unplayable_notes_and_bad_lags():
+    with pytest.raises(ValueError):
+        StreamingFingeringSolver(0)
+    with pytest.raises(ValueError):
+        StreamingFingeringSolver().push("C9")